@@ -0,0 +1,29 @@
+"""Event-loop responsiveness probe shared by the concurrency benchmarks."""
+import asyncio
+import time
+from typing import List
+import httpx
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """Percentile of latencies in seconds, in milliseconds."""
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+
+async def probe(
+    client: httpx.AsyncClient,
+    path: str,
+    done: asyncio.Event,
+    latencies: List[float],
+    interval: float = 0.01
+) -> None:
+    """GET `path` every `interval` seconds until `done` is set, recording each latency."""
+    # Latency is measured from the intended send time, so time spent
+    # waiting for a blocked event loop is counted
+    scheduled = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await client.get(path)
+        latencies.append(time.perf_counter() - scheduled)
+        scheduled += interval
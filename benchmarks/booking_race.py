@@ -0,0 +1,153 @@
+"""
+Concurrent booking stress test: many workers racing for the same slot.
+
+Starts several processes (like several uvicorn workers), each running a number
+of concurrent booking attempts through `utils.booking.book_appointment` against
+a fresh file-backed SQLite database. In every round all attempts target the
+same doctor and slot; exactly one must win and every other attempt must be
+rejected as a conflict. Per-round throughput is reported so regressions in
+lock handling show up as unstable or collapsing rounds.
+
+Exits non-zero if any round does not have exactly one winner.
+
+Usage:
+    python -m benchmarks.booking_race [--processes 4] [--tasks 8] [--rounds 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time as dt_time, timedelta
+from multiprocessing import Manager
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from config import settings
+from database import Base, engine_options, set_sqlite_pragmas
+from models import DbDoctor, DbSpeciality, DbWorkingHours
+from utils.appointment_utils import clinic_timezone
+from utils.booking import SlotUnavailableError, book_appointment
+
+OPEN, CLOSE = dt_time(0, 0), dt_time(23, 30)
+
+
+def setup_database(url: str) -> int:
+    setup_engine = create_engine(url)
+    event.listen(setup_engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(bind=setup_engine)
+    db = sessionmaker(bind=setup_engine)()
+    doctor = DbDoctor(
+        name="Dr. Bench", about="", address={"line1": "1 Bench Street", "line2": ""},
+        degree="MBBS", experience="1 Year", experience_years=1, fees=0, image="",
+        speciality=DbSpeciality(title="Bench", key="bench", icon=""), available=True,
+        working_hours=[DbWorkingHours(weekday=weekday, start_time=OPEN, end_time=CLOSE)
+                       for weekday in range(7)]
+    )
+    db.add(doctor)
+    db.commit()
+    doctor_id = doctor.id
+    db.close()
+    setup_engine.dispose()
+    return doctor_id
+
+
+def slot_starts(rounds: int) -> list:
+    """One slot per round, starting tomorrow at opening time."""
+    slot = timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+    day = datetime.now(clinic_timezone()).date() + timedelta(days=1)
+    first = datetime.combine(day, OPEN, tzinfo=clinic_timezone())
+    return [first + i * slot for i in range(rounds)]
+
+
+def worker_process(url: str, doctor_id: int, worker: int, tasks: int, starts: list, barrier) -> list:
+    async def attempt(Session, user_id: int, start: datetime) -> tuple:
+        began = time.perf_counter()
+        async with Session() as db:
+            try:
+                await book_appointment(
+                    db, user_id, doctor_id, start,
+                    start + timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES))
+                await db.commit()
+                outcome = "won"
+            except SlotUnavailableError:
+                outcome = "conflict"
+            except Exception as e:
+                outcome = f"error: {type(e).__name__}: {e}"
+        return outcome, time.perf_counter() - began
+
+    async def run_rounds() -> list:
+        bench_engine = create_async_engine(url, **engine_options(url))
+        event.listen(bench_engine.sync_engine, "connect", set_sqlite_pragmas)
+        Session = async_sessionmaker(bind=bench_engine, expire_on_commit=False)
+        results = []
+        for start in starts:
+            await asyncio.to_thread(barrier.wait)
+            began = time.perf_counter()
+            outcomes = await asyncio.gather(*[
+                attempt(Session, worker * tasks + task + 1, start) for task in range(tasks)
+            ])
+            results.append((outcomes, time.perf_counter() - began))
+        await bench_engine.dispose()
+        return results
+
+    return asyncio.run(run_rounds())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=8,
+                        help="Concurrent booking attempts per process and round")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="booking_bench_")
+    path = os.path.join(directory, "bench.db")
+    doctor_id = setup_database(f"sqlite:///{path}")
+    starts = slot_starts(args.rounds)
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=args.processes) as pool:
+        barrier = manager.Barrier(args.processes)
+        futures = [
+            pool.submit(worker_process, f"sqlite+aiosqlite:///{path}", doctor_id,
+                        worker, args.tasks, starts, barrier)
+            for worker in range(args.processes)
+        ]
+        per_worker = [future.result() for future in futures]
+
+    attempts = args.processes * args.tasks
+    failed_rounds = 0
+    rates = []
+    for index, start in enumerate(starts):
+        outcomes = [outcome for worker in per_worker for outcome,
+                    _ in worker[index][0]]
+        latencies = [latency for worker in per_worker for _,
+                     latency in worker[index][0]]
+        elapsed = max(worker[index][1] for worker in per_worker)
+        won = outcomes.count("won")
+        conflicts = outcomes.count("conflict")
+        errors = [outcome for outcome in outcomes if outcome.startswith("error")]
+        rates.append(attempts / elapsed)
+        if won != 1 or errors:
+            failed_rounds += 1
+        print(f"round {index + 1:3d} {start:%H:%M}: won {won}  conflicts {conflicts:4d}  "
+              f"errors {len(errors):3d}  {attempts / elapsed:8.1f} attempts/s  "
+              f"max latency {max(latencies) * 1000:7.1f} ms")
+        for error in sorted(set(errors)):
+            print(f"    {error}")
+
+    print(f"\n{attempts} attempts per round over {args.rounds} rounds: "
+          f"{statistics.mean(rates):.1f} attempts/s mean, "
+          f"{statistics.pstdev(rates):.1f} stdev, {min(rates):.1f} min")
+    if failed_rounds:
+        print(f"{failed_rounds} rounds did not have exactly one winner")
+        sys.exit(1)
+    print("every round had exactly one winner")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Concurrent-request throughput: blocking Session vs AsyncSession.
+
+Serves the same query from two handlers, one using the synchronous
+`SessionLocal` inside `async def` (the pre-async pattern) and one using the
+`get_db` AsyncSession, and fires concurrent requests at each through the
+ASGI interface. A probe hits a trivial endpoint meanwhile: with the blocking
+session its latency includes every in-flight query, since they all run on the
+event loop.
+
+Usage:
+    python -m benchmarks.db_concurrency [--requests 200] [--concurrency 20] [--rows 200000]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from benchmarks._probe import percentile, probe
+from database import SessionLocal, async_engine, get_db
+
+# Query whose cost is spent inside the database driver, like a slow real query
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :rows) "
+    "SELECT count(*) FROM c"
+)
+
+app = FastAPI()
+rows = 200_000
+
+
+@app.get("/sync")
+async def blocking_handler():
+    db = SessionLocal()
+    try:
+        return {"count": db.execute(SLOW_QUERY, {"rows": rows}).scalar_one()}
+    finally:
+        db.close()
+
+
+@app.get("/async")
+async def async_handler(db: AsyncSession = Depends(get_db)):
+    return {"count": (await db.execute(SLOW_QUERY, {"rows": rows})).scalar_one()}
+
+
+@app.get("/ping")
+async def ping():
+    return {}
+
+
+async def run(path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await client.get(path)  # warm up the connection pool
+        probe_task = asyncio.create_task(probe(client, "/ping", done, probe_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    # Pooled connections belong to this event loop
+    await async_engine.dispose()
+
+    return {
+        "req_per_sec": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        "probe_p99_ms": percentile(probe_latencies, 0.99),
+    }
+
+
+def main():
+    global rows
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=rows)
+    args = parser.parse_args()
+    rows = args.rows
+
+    for label, path in (("blocking Session", "/sync"), ("AsyncSession", "/async")):
+        result = asyncio.run(run(path, args.requests, args.concurrency))
+        print(f"{label:>16}: {result['req_per_sec']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+              f"/ping p99 {result['probe_p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
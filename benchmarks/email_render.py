@@ -0,0 +1,89 @@
+"""
+Email template render cost.
+
+Measures how long it takes to compile the email templates (with and without
+the on-disk bytecode cache) and to render N emails: once with a template
+lookup per send on an auto-reloading environment (the previous behaviour) and
+once through the precompiled `render_email` path. Both render the HTML and the
+text alternative. Run it after changing a template to track render cost as
+templates grow.
+
+Usage:
+    python -m benchmarks.email_render [--emails 5000]
+"""
+import argparse
+import tempfile
+import time
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from utils.email_utils import (
+    EMAIL_TEMPLATES, compiled_templates, create_template_environment, load_email_templates,
+    render_email, template_dir
+)
+
+APPOINTMENT_CONTEXT = {
+    "user_name": "Jane Doe",
+    "doctor_name": "Richard James",
+    "doctor_speciality": "General physician",
+    "day_date": "Tue 18",
+    "time": "13:00",
+    "address": "17th Cross, Richmond",
+}
+SAMPLE_CONTEXT = {
+    "email_verification": {"otp_code": "123456"},
+    "appointment_confirmation": APPOINTMENT_CONTEXT,
+    "appointment_reminder": APPOINTMENT_CONTEXT,
+}
+
+
+def compile_seconds(bytecode_cache_dir=None) -> float:
+    env = create_template_environment(bytecode_cache_dir)
+    start = time.perf_counter()
+    for name in EMAIL_TEMPLATES:
+        for extension in ("html", "txt"):
+            env.get_template(f"{name}.{extension}")
+    return time.perf_counter() - start
+
+
+def per_send_lookup(name: str, emails: int) -> float:
+    env = Environment(loader=FileSystemLoader(str(template_dir)),
+                      autoescape=select_autoescape(["html"]))
+    context = SAMPLE_CONTEXT[name]
+    start = time.perf_counter()
+    for _ in range(emails):
+        env.get_template(f"{name}.html").render(**context)
+        env.get_template(f"{name}.txt").render(**context)
+    return time.perf_counter() - start
+
+
+def precompiled(name: str, emails: int) -> float:
+    context = SAMPLE_CONTEXT[name]
+    start = time.perf_counter()
+    for _ in range(emails):
+        render_email(name, **context)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=5000)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="email_bytecode_")
+    compile_seconds(cache_dir)  # populate the bytecode cache
+    print(f"compile all templates: {compile_seconds() * 1000:7.2f} ms, "
+          f"{compile_seconds(cache_dir) * 1000:7.2f} ms from bytecode cache")
+
+    compiled_templates.clear()
+    load_email_templates()
+    for name in EMAIL_TEMPLATES:
+        html, text = render_email(name, **SAMPLE_CONTEXT[name])
+        lookup = per_send_lookup(name, args.emails)
+        render = precompiled(name, args.emails)
+        print(f"{name:<26} html {len(html):6d} B  text {len(text):5d} B  "
+              f"lookup per send {lookup / args.emails * 1e6:7.1f} us  "
+              f"precompiled {render / args.emails * 1e6:7.1f} us  "
+              f"{args.emails / render:9.0f} emails/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Latency of unrelated endpoints during a login storm.
+
+Fires concurrent password checks at two handlers through the ASGI interface:
+one calling bcrypt inline inside `async def` (the previous behaviour) and one
+going through `PasswordHasher`'s thread pool. A probe hits a trivial endpoint
+every 10 ms meanwhile; with inline bcrypt its latency includes every password
+check in progress, since they all run on the event loop.
+
+Usage:
+    python -m benchmarks.login_storm [--logins 100] [--concurrency 20] [--workers 2]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from benchmarks._probe import percentile, probe
+from config import settings
+from utils.password_utils import PasswordHasher, get_password_hash, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+app = FastAPI()
+hashed = get_password_hash(PASSWORD)
+hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS)
+
+
+@app.post("/inline")
+async def inline_login():
+    return {"ok": verify_password(PASSWORD, hashed)}
+
+
+@app.post("/pooled")
+async def pooled_login():
+    return {"ok": await hasher.verify(PASSWORD, hashed)}
+
+
+@app.get("/ping")
+async def ping():
+    return {}
+
+
+async def run(path: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.post(path)
+                response.raise_for_status()
+
+        probe_task = asyncio.create_task(probe(client, "/ping", done, probe_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "logins_per_sec": logins / elapsed,
+        "probe_p50_ms": percentile(probe_latencies, 0.5),
+        "probe_p99_ms": percentile(probe_latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS,
+                        help="PasswordHasher threads")
+    args = parser.parse_args()
+    hasher.workers = args.workers
+
+    for label, path in (("inline bcrypt", "/inline"), (f"pool of {args.workers}", "/pooled")):
+        result = asyncio.run(run(path, args.logins, args.concurrency))
+        print(f"{label:>13}: {result['logins_per_sec']:6.1f} logins/s  "
+              f"/ping p50 {result['probe_p50_ms']:7.1f} ms  p99 {result['probe_p99_ms']:7.1f} ms")
+    stats = hasher.stats()
+    print(f"pool queue: max {stats['max_queued']} waiting, "
+          f"avg wait {stats['avg_wait_ms']:.1f} ms, max wait {stats['max_wait_ms']:.1f} ms")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Reminder job throughput and memory at increasing appointment counts.
+
+Fills a fresh SQLite database with N appointments inside the reminder window
+and runs `utils.reminders.send_due_reminders` over it, tracing Python memory.
+Peak memory should stay flat as N grows because the job only ever holds one
+batch; a second run must queue nothing.
+
+Usage:
+    python -m benchmarks.reminder_batch [--sizes 10000 50000] [--batch 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from config import settings
+from database import Base, set_sqlite_pragmas
+from models import DbAppointment, DbDoctor, DbEmailOutbox, DbSpeciality, DbUser
+from utils.email_utils import load_email_templates
+from utils.reminders import send_due_reminders
+
+DOCTORS = 50
+USERS = 1000
+
+
+def populate(Session, appointments: int, now: datetime) -> None:
+    db = Session()
+    speciality = DbSpeciality(title="General physician",
+                              key="general-physician", icon="")
+    db.add(speciality)
+    db.flush()
+    db.execute(insert(DbDoctor), [
+        {"name": f"Doctor {i}", "about": "", "address": {"line1": f"{i} Main Street", "line2": ""},
+         "degree": "MBBS", "experience": "1 Year", "experience_years": 1, "fees": 50,
+         "image": "", "speciality_id": speciality.id, "available": True}
+        for i in range(DOCTORS)
+    ])
+    db.execute(insert(DbUser), [
+        {"name": f"Patient {i}", "username": f"patient{i}", "email": f"patient{i}@example.com",
+         "hashed_password": "x", "is_verified": True}
+        for i in range(USERS)
+    ])
+
+    # Spread appointments evenly over the reminder window, one slot per doctor
+    window = timedelta(hours=settings.REMINDER_HOURS_BEFORE)
+    step = window / (appointments // DOCTORS + 1)
+    for offset in range(0, appointments, 10000):
+        rows = []
+        for i in range(offset, min(offset + 10000, appointments)):
+            start = now + step * (i // DOCTORS + 1)
+            rows.append({"user_id": i % USERS + 1, "doctor_id": i % DOCTORS + 1,
+                         "start": start, "end": start + timedelta(minutes=30)})
+        db.execute(insert(DbAppointment), rows)
+    db.commit()
+    db.close()
+
+
+def run(appointments: int, batch_size: int) -> None:
+    directory = tempfile.mkdtemp(prefix="reminder_bench_")
+    bench_engine = create_engine(
+        f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    event.listen(bench_engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(bind=bench_engine)
+    Session = sessionmaker(bind=bench_engine)
+
+    now = datetime.now(timezone.utc)
+    populate(Session, appointments, now)
+
+    db = Session()
+    tracemalloc.start()
+    start = time.perf_counter()
+    counts = send_due_reminders(db, now=now, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    again = send_due_reminders(db, now=now, batch_size=batch_size)
+    queued = db.scalar(select(func.count()).select_from(DbEmailOutbox))
+    db.close()
+    bench_engine.dispose()
+
+    print(f"{appointments:>9} appointments: {counts['queued'] / elapsed:8.0f} reminders/s  "
+          f"{counts['batches']:5d} batches  peak {peak / 1024 / 1024:6.1f} MiB  "
+          f"outbox {queued}  second run queued {again['queued']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--batch", type=int, default=settings.REMINDER_BATCH_SIZE)
+    args = parser.parse_args()
+
+    load_email_templates()
+    for size in args.sizes:
+        run(size, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+SMTP delivery throughput: a connection per message vs the persistent pool.
+
+Starts a local aiosmtpd server standing in for the real SMTP relay. The relay's
+connection setup (STARTTLS + login round trips) and per-command latency are
+simulated with `--handshake-ms` and `--command-ms`. The script then sends the
+same messages once with a fresh connection per message (the previous
+behaviour) and once through `SMTPConnectionPool`, in outbox-sized batches.
+
+Usage:
+    python -m benchmarks.smtp_throughput [--messages 200] [--pool-size 2] [--batch 50]
+"""
+import argparse
+import asyncio
+import time
+from aiosmtpd.controller import Controller
+from config import settings
+from utils.email_utils import build_message, open_smtp_connection
+from utils.smtp_pool import SMTPConnectionPool
+
+
+class SlowSink:
+    """aiosmtpd handler that accepts everything after a simulated delay."""
+
+    def __init__(self, handshake: float, command: float):
+        self.handshake = handshake
+        self.command = command
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await asyncio.sleep(self.command)
+        envelope.mail_from = address
+        envelope.mail_options.extend(mail_options)
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(self.command)
+        envelope.rcpt_tos.append(address)
+        envelope.rcpt_options.extend(rcpt_options)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.command)
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def per_message(messages: list) -> int:
+    for message in messages:
+        server = open_smtp_connection()
+        try:
+            server.send_message(message)
+        finally:
+            server.quit()
+    return len(messages)
+
+
+def pooled(pool: SMTPConnectionPool, messages: list, batch: int) -> int:
+    failed = 0
+    for i in range(0, len(messages), batch):
+        failed += sum(error is not None for error in pool.send_many(messages[i:i + batch]))
+    return len(messages) - failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=settings.SMTP_POOL_SIZE)
+    parser.add_argument("--batch", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+    parser.add_argument("--handshake-ms", type=float, default=20,
+                        help="Simulated connection setup cost (TLS + login)")
+    parser.add_argument("--command-ms", type=float, default=2,
+                        help="Simulated latency of MAIL, RCPT and DATA")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    sink = SlowSink(args.handshake_ms / 1000, args.command_ms / 1000)
+    controller = Controller(sink, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    settings.SMTP_SERVER, settings.SMTP_PORT = "127.0.0.1", args.port
+    settings.SMTP_STARTTLS, settings.SMTP_PASSWORD = False, ""
+
+    messages = [build_message(f"patient{i}@example.com", "Benchmark", f"<p>Message {i}</p>")
+                for i in range(args.messages)]
+    try:
+        start = time.perf_counter()
+        sent = per_message(messages)
+        elapsed = time.perf_counter() - start
+        print(f"connection per message: {sent / elapsed:8.1f} messages/s  "
+              f"({sent} sent, {sent} connections)")
+
+        pool = SMTPConnectionPool(size=args.pool_size)
+        start = time.perf_counter()
+        sent = pooled(pool, messages, args.batch)
+        elapsed = time.perf_counter() - start
+        stats = pool.stats()
+        print(f"pool of {args.pool_size:<2}            : {sent / elapsed:8.1f} messages/s  "
+              f"({sent} sent, {stats['connections_opened']} connections)")
+        pool.close()
+    finally:
+        controller.stop()
+
+    print(f"sink received {sink.received} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cold-start latency of the API.
+
+Starts fresh interpreters that import `main`, run the application lifespan and
+serve a first GET /doctors through the ASGI interface, timing each step.
+Every configuration runs against the same migrated and seeded throwaway SQLite
+database:
+
+- eager: the defaults; migrations, seeding and template compilation run on startup
+- lazy: `RUN_MIGRATIONS_ON_STARTUP`, `SEED_ON_STARTUP` and
+  `PRELOAD_EMAIL_TEMPLATES` off, as on a serverless deployment
+
+Background workers are disabled in both so they do not compete with the first
+request. "process" is the child's wall time as seen by the parent, including
+interpreter start-up.
+
+Usage:
+    python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+CONFIGURATIONS = {
+    "eager": {},
+    "lazy": {
+        "RUN_MIGRATIONS_ON_STARTUP": "false",
+        "SEED_ON_STARTUP": "false",
+        "PRELOAD_EMAIL_TEMPLATES": "false",
+    },
+}
+STEPS = ("import", "startup", "first_request", "process")
+
+
+def measure() -> dict:
+    """Time importing the app, its lifespan start-up and a first request, in ms."""
+    start = time.perf_counter()
+    from database import async_engine
+    from main import app
+    imported = time.perf_counter()
+
+    async def first_request():
+        async with app.router.lifespan_context(app):
+            started = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get("/doctors")
+                response.raise_for_status()
+            responded = time.perf_counter()
+        await async_engine.dispose()
+        return started, responded
+
+    started, responded = asyncio.run(first_request())
+    return {
+        "import": (imported - start) * 1000,
+        "startup": (started - imported) * 1000,
+        "first_request": (responded - started) * 1000,
+    }
+
+
+def run_child(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per configuration")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="startup_")
+    base_env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        "EMAIL_OUTBOX_WORKER": "false",
+        "REMINDER_SCHEDULER": "false",
+    }
+    # Prepare the database the way a deploy step would
+    for module in ("utils.migrations", "utils.seed_doctors"):
+        subprocess.run([sys.executable, "-m", module], env=base_env, check=True,
+                       capture_output=True)
+
+    for label, overrides in CONFIGURATIONS.items():
+        runs = [run_child({**base_env, **overrides}) for _ in range(args.runs)]
+        medians = {step: statistics.median(run[step] for run in runs) for step in STEPS}
+        print(f"{label:>5}: " + "  ".join(
+            f"{step} {medians[step]:7.1f} ms" for step in STEPS) + "  (medians)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Concurrent SQLite write throughput: default engine vs configured pool and pragmas.
+
+Starts several writer processes (like several uvicorn workers), each inserting
+contact messages with one commit per row, first against a database opened with
+SQLAlchemy defaults and then against one using the `Settings` pool options and
+SQLite pragmas. Each mode uses a fresh database file because the journal mode
+is persisted in the file.
+
+Usage:
+    python -m benchmarks.write_concurrency [--processes 4] [--threads 4] [--writes 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from database import Base, engine_options, set_sqlite_pragmas
+from models import DbContact
+
+
+def make_engine(url: str, tuned: bool):
+    if not tuned:
+        return create_engine(url)
+    bench_engine = create_engine(url, **engine_options(url))
+    event.listen(bench_engine, "connect", set_sqlite_pragmas)
+    return bench_engine
+
+
+def writer_process(url: str, tuned: bool, threads: int, writes: int) -> tuple:
+    bench_engine = make_engine(url, tuned)
+    Session = sessionmaker(bind=bench_engine)
+
+    def write(thread: int) -> tuple:
+        ok = failed = 0
+        for i in range(writes):
+            db = Session()
+            try:
+                db.add(DbContact(name=f"bench {os.getpid()}", email="bench@example.com",
+                                 subject="benchmark", message=f"{thread}-{i}"))
+                db.commit()
+                ok += 1
+            except Exception:
+                db.rollback()
+                failed += 1
+            finally:
+                db.close()
+        return ok, failed
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(write, range(threads)))
+    bench_engine.dispose()
+    return sum(ok for ok, _ in results), sum(failed for _, failed in results)
+
+
+def run(tuned: bool, processes: int, threads: int, writes: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="write_bench_")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    setup_engine = make_engine(url, tuned)
+    Base.metadata.create_all(bind=setup_engine, tables=[DbContact.__table__])
+    setup_engine.dispose()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(writer_process, [url] * processes, [tuned] * processes,
+                                [threads] * processes, [writes] * processes))
+    elapsed = time.perf_counter() - start
+
+    ok = sum(ok for ok, _ in results)
+    return {
+        "writes_per_sec": ok / elapsed,
+        "committed": ok,
+        "failed": sum(failed for _, failed in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=200,
+                        help="Inserts per thread")
+    args = parser.parse_args()
+
+    for label, tuned in (("defaults", False), ("configured", True)):
+        result = run(tuned, args.processes, args.threads, args.writes)
+        print(f"{label:>10}: {result['writes_per_sec']:8.1f} writes/s  "
+              f"committed {result['committed']:6d}  failed {result['failed']:5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,106 @@
+from datetime import time
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./health_connect.db"
+
+    # Connection pool (ignored for in-memory SQLite databases)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB, i.e. 64 MB
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Work done when the application starts. Serverless deployments turn these
+    # off and run `python -m utils.migrations` and `python -m utils.seed_doctors`
+    # as a deploy step instead, so cold starts skip them.
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+    SEED_ON_STARTUP: bool = True
+    PRELOAD_EMAIL_TEMPLATES: bool = True  # otherwise each template compiles on first use
+
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Token-bucket limits on /auth/login, /auth/signup and /auth/verify-email,
+    # per client IP and per username/email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # or "sqlite" to share buckets between workers
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # memory backend only
+    # Reverse proxies in front of the app (e.g. 1 on Vercel); the client IP is
+    # then read from X-Forwarded-For. 0 uses the connecting address.
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0
+    AUTH_RATE_LIMIT_IP_BURST: float = 20
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 10
+    AUTH_RATE_LIMIT_ACCOUNT_BURST: float = 5
+    AUTH_RATE_LIMIT_ACCOUNT_PER_MINUTE: float = 2
+    # Pending signups: "database" (shared by all workers) or "memory" (single worker only)
+    PENDING_SIGNUP_STORE: str = "database"
+    PENDING_SIGNUP_MAX_ENTRIES: int = 10000  # memory store only
+    # bcrypt cost factor; calibrate with `python -m utils.calibrate_bcrypt --target-ms 250`.
+    # Stored hashes with another cost are re-hashed on the next login.
+    BCRYPT_ROUNDS: int = 12
+    # Threads hashing and verifying passwords (bcrypt) per worker; more calls queue
+    PASSWORD_HASH_WORKERS: int = 2
+    # Authenticated user lookups cached per worker, keyed by token subject
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Doctor catalog response cache
+    CATALOG_CACHE_MAXSIZE: int = 256
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+
+    # Appointments
+    APPOINTMENT_TIMEZONE: str = "UTC"  # clinic-local zone for display and naive input
+    APPOINTMENT_DURATION_MINUTES: int = 30
+    # Working hours for doctors without their own template (0 = Monday)
+    DEFAULT_WORKING_DAYS: List[int] = [0, 1, 2, 3, 4]
+    DEFAULT_WORKING_HOURS_START: time = time(9, 0)
+    DEFAULT_WORKING_HOURS_END: time = time(17, 0)
+    MAX_SLOT_RANGE_DAYS: int = 31
+    # Upcoming appointments embedded in GET /users/profile
+    PROFILE_UPCOMING_APPOINTMENTS: int = 5
+    # Appointment reminders
+    REMINDER_HOURS_BEFORE: float = 24
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_SCHEDULER: bool = True  # run the reminder job from each API worker
+    REMINDER_INTERVAL_SECONDS: float = 900
+    # How long a POST /appointments Idempotency-Key is remembered
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    # An unfinished request's claim on its key lapses after this long (e.g. if its worker died)
+    IDEMPOTENCY_KEY_LEASE_SECONDS: int = 60
 
     # SMTP Settings
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
-    SMTP_USERNAME: str
-    SMTP_PASSWORD: str
+    SMTP_USERNAME: str = ""  # sender address; required to deliver email
+    SMTP_PASSWORD: str = ""  # empty to skip login, e.g. for a local SMTP sink
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 10
+    # Persistent connection pool used for delivery
+    SMTP_POOL_SIZE: int = 2
+    SMTP_POOL_MAX_IDLE_SECONDS: float = 60  # idle connections are closed after this
+    SMTP_POOL_HEALTHCHECK_SECONDS: float = 10  # NOOP before reusing a connection idle this long
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+
+    # Directory for compiled email template bytecode; unset to compile in memory only
+    EMAIL_TEMPLATE_BYTECODE_CACHE_DIR: Optional[str] = None
+
+    # Email outbox delivery
+    EMAIL_OUTBOX_WORKER: bool = True  # deliver from a background task in each API worker
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: float = 30  # doubled after every failed attempt
+    EMAIL_RETRY_MAX_SECONDS: float = 3600
 
     class Config:
         env_file = ".env"
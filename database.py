@@ -1,21 +1,81 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+# Async and sync drivers used for each backend; DATABASE_URL may name either
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+SYNC_DRIVERS = {
+    "sqlite": "sqlite",
+    "postgresql": "postgresql",
+    "mysql": "mysql",
+}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def _with_driver(url: str, drivers: dict) -> str:
+    parsed = make_url(url)
+    drivername = drivers.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for `url`; in-memory SQLite uses a single shared connection instead."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured performance pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(
+            f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    finally:
+        cursor.close()
+
+
+SQLALCHEMY_DATABASE_URL = _with_driver(settings.DATABASE_URL, SYNC_DRIVERS)
+ASYNC_SQLALCHEMY_DATABASE_URL = _with_driver(
+    settings.DATABASE_URL, ASYNC_DRIVERS)
+
+# Synchronous engine for migrations, seeding and command line tools
+engine = create_engine(SQLALCHEMY_DATABASE_URL,
+                       **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asynchronous engine used by the API so queries never block the event loop
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
 Base = declarative_base()
 
 # Dependency
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
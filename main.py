@@ -1,17 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
 from routers.auth import router as auth_router
 from routers.doctors import router as doctor_router
 from routers.users import router as user_router
 from routers.contact import router as contact_router
 from routers.appointments import router as appointment_router
+from routers.metrics import router as metrics_router
+from routers.stats import router as stats_router
+from config import settings
+from utils.email_utils import load_email_templates
+from utils.migrations import run_migrations
+from utils.outbox import outbox_worker
+from utils.password_utils import password_hasher
+from utils.rate_limit import rate_limiter
+from utils.reminders import reminder_scheduler
 from utils.seed_doctors import seed_doctors
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create tables, upgrade existing databases and seed initial data; disable
+    # these where a deploy step does it, so cold starts stay fast
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+    if settings.SEED_ON_STARTUP:
+        seed_doctors()
+    # Compile email templates once instead of on the first request
+    if settings.PRELOAD_EMAIL_TEMPLATES:
+        load_email_templates()
+    # Deliver queued emails and reminders in the background of each worker process
+    if settings.EMAIL_OUTBOX_WORKER:
+        outbox_worker.start()
+    if settings.REMINDER_SCHEDULER:
+        reminder_scheduler.start()
+    yield
+    await reminder_scheduler.stop()
+    await outbox_worker.stop()
+    password_hasher.shutdown()
+    rate_limiter.close()
+
+
 app = FastAPI(
     title="Health Connect API",
     description="API for Health Connect application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -23,15 +57,11 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-# Seed initial data
-seed_doctors()
-
 # Include routers
 app.include_router(auth_router)
 app.include_router(doctor_router)
 app.include_router(user_router)
 app.include_router(contact_router)
 app.include_router(appointment_router)
+app.include_router(metrics_router)
+app.include_router(stats_router)
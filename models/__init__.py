@@ -1,6 +1,16 @@
 from models.user import DbUser
+from models.speciality import DbSpeciality
 from models.doctor import DbDoctor
 from models.appointment import DbAppointment
 from models.contact import DbContact
+from models.working_hours import DbWorkingHours
+from models.idempotency_key import DbIdempotencyKey
+from models.email_outbox import DbEmailOutbox
+from models.booking_stats import DbDepartmentDailyBookings, DbDoctorBookingStats
+from models.pending_signup import DbPendingSignup
+from models.quarantined_appointment import DbQuarantinedAppointment
 
-__all__ = ['DbUser', 'DbDoctor', 'DbAppointment', 'DbContact']
+__all__ = ['DbUser', 'DbSpeciality', 'DbDoctor', 'DbAppointment', 'DbContact',
+           'DbWorkingHours', 'DbIdempotencyKey',
+           'DbEmailOutbox', 'DbDoctorBookingStats', 'DbDepartmentDailyBookings',
+           'DbPendingSignup', 'DbQuarantinedAppointment']
@@ -1,16 +1,34 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from models.types import UTCDateTime
+from utils.appointment_utils import format_appointment_time
 
 
 class DbAppointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # One booking per doctor and slot; concurrent bookings of the same slot
+        # are rejected by the database rather than by a racy read-then-write
+        Index("ix_appointments_doctor_id_start",
+              "doctor_id", "start", unique=True),
+        Index("ix_appointments_user_id_start", "user_id", "start"),
+        # Reminder job walks upcoming appointments across all doctors
+        Index("ix_appointments_start", "start"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     doctor_id = Column(Integer, ForeignKey("doctors.id"))
-    date_time = Column(String)
+    start = Column(UTCDateTime, nullable=False)
+    end = Column(UTCDateTime, nullable=False)
+    reminder_sent_at = Column(UTCDateTime, nullable=True)
 
     # Relationships
     user = relationship("DbUser", back_populates="appointments")
     doctor = relationship("DbDoctor", back_populates="appointments")
+
+    @property
+    def date_time(self):
+        """Human-readable start time, e.g. "Tue 18 | 13:00"."""
+        return format_appointment_time(self.start)
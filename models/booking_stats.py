@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer
+from database import Base
+
+
+class DbDoctorBookingStats(Base):
+    """Running booking count per doctor, kept in step with `appointments`."""
+    __tablename__ = "doctor_booking_stats"
+    __table_args__ = (
+        # Top-N and "popular" orderings read this index backwards
+        Index("ix_doctor_booking_stats_bookings", "bookings"),
+    )
+
+    doctor_id = Column(Integer, ForeignKey("doctors.id"), primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)
+
+
+class DbDepartmentDailyBookings(Base):
+    """Bookings per speciality and clinic-local appointment day."""
+    __tablename__ = "department_daily_bookings"
+    __table_args__ = (
+        Index("ix_department_daily_bookings_day", "day"),
+    )
+
+    speciality_id = Column(Integer, ForeignKey("specialities.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Boolean, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -10,12 +10,19 @@ class DbDoctor(Base):
     name = Column(String, nullable=False)
     about = Column(String, nullable=True)
     address = Column(JSON, nullable=False)
-    available = Column(Boolean, default=True)
+    available = Column(Boolean, default=True, index=True)
     degree = Column(String, nullable=False)
     experience = Column(String, nullable=False)
-    fees = Column(Integer, nullable=False)
+    # Years parsed from `experience` so it can be filtered on
+    experience_years = Column(Integer, nullable=True, index=True)
+    fees = Column(Integer, nullable=False, index=True)
     image = Column(String, nullable=True)
-    speciality = Column(JSON, nullable=False)
+    speciality_id = Column(Integer, ForeignKey(
+        "specialities.id"), nullable=False, index=True)
 
     # Relationships
+    speciality = relationship(
+        "DbSpeciality", back_populates="doctors", lazy="joined")
     appointments = relationship("DbAppointment", back_populates="doctor")
+    working_hours = relationship(
+        "DbWorkingHours", back_populates="doctor", cascade="all, delete-orphan")
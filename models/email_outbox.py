@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, Index
+from database import Base
+from models.types import UTCDateTime
+
+
+class DbEmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Delivery worker polls for due pending messages
+        Index("ix_email_outbox_status_next_attempt_at",
+              "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    # pending -> sent, or failed once EMAIL_MAX_ATTEMPTS is exhausted
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(UTCDateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(UTCDateTime, nullable=False)
+    sent_at = Column(UTCDateTime, nullable=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from database import Base
+from models.types import UTCDateTime
+
+
+class DbIdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_user_id_key",
+              "user_id", "key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String, nullable=False)
+    # Hash of the request body; a key may only be replayed for the same request
+    request_hash = Column(String, nullable=False)
+    # NULL until the first request with this key has finished
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    expires_at = Column(UTCDateTime, nullable=False, index=True)
+    # When the request now holding the key claimed it; unfinished claims lapse
+    # after IDEMPOTENCY_KEY_LEASE_SECONDS
+    claimed_at = Column(UTCDateTime, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String
+from database import Base
+from models.types import UTCDateTime
+
+
+class DbPendingSignup(Base):
+    """Signup awaiting email verification (see utils/signup_store.py)."""
+    __tablename__ = "pending_signups"
+
+    email = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    username = Column(String, nullable=False)
+    hashed_password = Column(String, nullable=False)
+    verification_code = Column(String, nullable=False)
+    expires_at = Column(UTCDateTime, nullable=False, index=True)
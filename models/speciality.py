@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import relationship
+from database import Base
+
+
+class DbSpeciality(Base):
+    __tablename__ = "specialities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, nullable=False)
+    icon = Column(String, nullable=False)
+    # Case-folded title used for department lookups
+    key = Column(String, unique=True, nullable=False, index=True)
+
+    # Relationships
+    doctors = relationship("DbDoctor", back_populates="speciality")
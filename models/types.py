@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware datetime stored as UTC.
+
+    Values are converted to UTC before they are written (naive values are
+    assumed to already be UTC) and come back as aware UTC datetimes, also on
+    backends such as SQLite that do not store an offset.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.replace(tzinfo=None)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.replace(tzinfo=timezone.utc)
@@ -12,6 +12,8 @@ class DbUser(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
     is_verified = Column(Boolean, default=False)
+    # Clinic staff may manage doctors; grant with `python -m utils.staff <username>`
+    is_staff = Column(Boolean, nullable=False, default=False)
     verification_code = Column(String, nullable=True)
 
     # Relationships
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Time
+from sqlalchemy.orm import relationship
+from database import Base
+
+
+class DbWorkingHours(Base):
+    __tablename__ = "doctor_working_hours"
+
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey(
+        "doctors.id"), nullable=False, index=True)
+    # 0 = Monday ... 6 = Sunday; times are clinic-local (APPOINTMENT_TIMEZONE)
+    weekday = Column(Integer, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    # Relationships
+    doctor = relationship("DbDoctor", back_populates="working_hours")
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Literal, Optional
 from database import get_db
 from models.appointment import DbAppointment
 from models.doctor import DbDoctor
 from schemas.appointment import AppointmentCreate, Appointment, AppointmentWithDoctor
+from utils.appointment_utils import to_utc
+from utils.booking import InvalidSlotError, SlotUnavailableError, book_appointment, cancel_appointment
+from utils.outbox import outbox_worker
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_time_cursor, encode_time_cursor
+)
 from utils.token_utils import get_current_user
 from routers.auth import oauth2_scheme
-from utils.email_utils import send_appointment_confirmation
+from utils.email_utils import queue_appointment_confirmation
+from utils.idempotency import (
+    IDEMPOTENCY_KEY_HEADER, IdempotencyKeyInProgressError, IdempotencyKeyMismatchError,
+    claim_idempotency_key, complete_idempotency_key, release_idempotency_key, request_hash
+)
 
 router = APIRouter(
     prefix="/appointments",
@@ -18,16 +31,40 @@ router = APIRouter(
 @router.post("/", response_model=Appointment)
 async def create_appointment(
     request: AppointmentCreate,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_KEY_HEADER, min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
+    claimed = False
+    user_id = None
     try:
         # Get current user
         current_user = await get_current_user(token, db)
+        # Kept aside: ORM attributes are expired again by a rollback
+        user_id = current_user.id
+
+        # Retries with the same Idempotency-Key get the stored response
+        if idempotency_key:
+            try:
+                replay = await claim_idempotency_key(
+                    db, user_id, idempotency_key, request_hash(request.model_dump_json()))
+            except IdempotencyKeyMismatchError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=str(e)
+                )
+            except IdempotencyKeyInProgressError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=str(e)
+                )
+            if replay is not None:
+                return replay
+            claimed = True
 
         # Check if doctor exists
-        doctor = db.query(DbDoctor).filter(
-            DbDoctor.id == request.doctor_id).first()
+        doctor = await db.get(DbDoctor, request.doctor_id)
         if not doctor:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -41,53 +78,50 @@ async def create_appointment(
                 detail=f"Doctor with id {request.doctor_id} is not available for appointments"
             )
 
-        # Create new appointment
-        new_appointment = DbAppointment(
-            user_id=current_user.id,
-            doctor_id=request.doctor_id,
-            date_time=request.date_time
-        )
-
-        db.add(new_appointment)
-        db.commit()
-        db.refresh(new_appointment)
-
-        # Get doctor details for email
-        doctor = db.query(DbDoctor).filter(
-            DbDoctor.id == request.doctor_id).first()
-        if not doctor:
+        # Reserve the slot; the unique (doctor_id, start) index settles races
+        try:
+            new_appointment = await book_appointment(
+                db, user_id, request.doctor_id, request.start, request.end)
+        except InvalidSlotError as e:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doctor not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except SlotUnavailableError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
             )
 
-    
-        doctor_details = {
-            "speciality": doctor.speciality['title'],
-            "address": doctor.address['line1']
-        }
-        
-
-        # Send confirmation email
-        if send_appointment_confirmation(
+        # Queue the confirmation email in the booking's transaction
+        queue_appointment_confirmation(
+            db,
             user_email=current_user.email,
             user_name=current_user.name,
             doctor_name=doctor.name,
-            date_time=request.date_time,
-            doctor_details=doctor_details
-        ):
-            print("Email sent successfully")
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send email"
-            )
+            date_time=new_appointment.date_time,
+            doctor_details={
+                "speciality": doctor.speciality.title,
+                "address": doctor.address['line1']
+            }
+        )
 
-        return new_appointment
+        response = Appointment.model_validate(new_appointment)
+        if claimed:
+            await complete_idempotency_key(
+                db, user_id, idempotency_key, status.HTTP_200_OK, response.model_dump_json())
+        await db.commit()
+        outbox_worker.notify()
+        return response
 
     except Exception as e:
         # Rollback the transaction in case of error
-        db.rollback()
+        await db.rollback()
+        # Let the client retry a failed request with the same key
+        if claimed:
+            await release_idempotency_key(db, user_id, idempotency_key)
+        if isinstance(e, HTTPException):
+            raise e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create appointment: {str(e)}"
@@ -96,54 +130,111 @@ async def create_appointment(
 
 @router.get("", response_model=List[AppointmentWithDoctor])
 async def get_user_appointments(
-    db: Session = Depends(get_db),
+    response: Response,
+    when: Optional[Literal["upcoming", "past"]] = Query(
+        None, description="Only upcoming (soonest first) or past (most recent first) appointments"),
+    start: Optional[datetime] = Query(
+        None, alias="from", description="Appointments starting at or after this time (ISO 8601)"),
+    end: Optional[datetime] = Query(
+        None, alias="to", description="Appointments starting before this time (ISO 8601)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(
+        None, description="X-Next-Cursor value of the previous page"),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
+    """
+    The current user's appointments ordered by start time, one page at a time.
+
+    Naive `from`/`to` times are read as clinic-local time.
+    """
+    cursor = decode_time_cursor(after)
     try:
         # Get current user
         current_user = await get_current_user(token, db)
 
-        # Get appointments with complete doctor details
-        appointments = db.query(DbAppointment).filter(
-            DbAppointment.user_id == current_user.id
-        ).all()
+        # Walks ix_appointments_user_id_start; the inner join skips orphaned rows
+        query = (
+            select(DbAppointment)
+            .options(joinedload(DbAppointment.doctor, innerjoin=True))
+            .where(DbAppointment.user_id == current_user.id)
+        )
+        now = datetime.now(timezone.utc)
+        if when == "upcoming":
+            query = query.where(DbAppointment.start >= now)
+        elif when == "past":
+            query = query.where(DbAppointment.start < now)
+        if start is not None:
+            query = query.where(DbAppointment.start >= to_utc(start))
+        if end is not None:
+            query = query.where(DbAppointment.start < to_utc(end))
+
+        # Keyset on (start, id); past appointments are listed newest first
+        position = tuple_(DbAppointment.start, DbAppointment.id)
+        descending = when == "past"
+        if cursor is not None:
+            query = query.where(position < cursor if descending else position > cursor)
+        order = (DbAppointment.start.desc(), DbAppointment.id.desc()) if descending \
+            else (DbAppointment.start, DbAppointment.id)
+        appointments = (await db.scalars(query.order_by(*order).limit(limit + 1))).all()
+
+        if len(appointments) > limit:
+            appointments = appointments[:limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_time_cursor(
+                appointments[-1].start, appointments[-1].id)
+
+        return [
+            AppointmentWithDoctor(
+                id=appt.id,
+                start=appt.start,
+                end=appt.end,
+                date_time=appt.date_time,
+                doctor=appt.doctor
+            )
+            for appt in appointments
+        ]
 
-        if not appointments:
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch appointments: {str(e)}"
+        )
+
+
+@router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_appointment(
+    appointment_id: int,
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """Cancel one of the current user's upcoming appointments, freeing the slot."""
+    try:
+        # Get current user
+        current_user = await get_current_user(token, db)
+
+        appointment = await db.get(DbAppointment, appointment_id)
+        if not appointment or appointment.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="No appointments found for the user"
+                detail=f"Appointment with id {appointment_id} not found"
             )
 
-        result = []
-        for appt in appointments:
-            try:
-                # Get doctor details
-                doctor = db.query(DbDoctor).filter(
-                    DbDoctor.id == appt.doctor_id).first()
-                if doctor:
-                    result.append(
-                        AppointmentWithDoctor(
-                            id=appt.id,
-                            date_time=appt.date_time,
-                            doctor=doctor
-                        )
-                    )
-            except Exception as inner_error:
-                # Log the error but continue processing other appointments
-                print(
-                    f"Error processing appointment {appt.id}: {str(inner_error)}")
-                continue
-
-        if not result:
+        try:
+            await cancel_appointment(db, appointment)
+        except InvalidSlotError as e:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No valid appointments found with doctor details"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
             )
-
-        return result
+        await db.commit()
 
     except Exception as e:
+        await db.rollback()
+        if isinstance(e, HTTPException):
+            raise e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch appointments: {str(e)}"
+            detail=f"Failed to cancel appointment: {str(e)}"
         )
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta, datetime, timezone
 from database import get_db
 from models import DbUser
 from schemas.user import UserCreate
 from schemas.token import Token
-from utils.password_utils import get_password_hash, verify_password
-from utils.email_utils import generate_otp, send_verification_email
+from utils.password_utils import password_hasher
+from utils.email_utils import generate_otp, queue_verification_email
+from utils.outbox import outbox_worker
+from utils.rate_limit import enforce_rate_limit
+from utils.signup_store import PendingSignup, PendingSignupStoreFullError, signup_store
 from utils.token_utils import create_access_token
 from config import settings
 from pydantic import BaseModel
-from typing import Dict
 
 router = APIRouter(
     prefix="/auth",
@@ -20,9 +23,6 @@ router = APIRouter(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-# Temporary storage for unverified users
-unverified_users: Dict[str, dict] = {}
-
 # OTP expiration time in minutes
 OTP_EXPIRY_MINUTES = 5
 
@@ -32,71 +32,85 @@ class VerifyEmail(BaseModel):
     verification_code: str
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(DbUser).filter(DbUser.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(DbUser).where(DbUser.username == username))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
-    return user
-
 
-def is_otp_expired(timestamp: datetime) -> bool:
-    """Check if OTP has expired based on the timestamp"""
-    now = datetime.now(timezone.utc)
-    return (now - timestamp).total_seconds() > (OTP_EXPIRY_MINUTES * 60)
+    # Upgrade hashes made with a different BCRYPT_ROUNDS; failing to do so
+    # must not fail the login
+    if new_hash:
+        try:
+            user.hashed_password = new_hash
+            await db.commit()
+        except Exception as e:
+            print(f"Failed to re-hash password for user {username}: {str(e)}")
+            await db.rollback()
+            await db.refresh(user)
+    return user
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(request: Request, user: UserCreate, db: AsyncSession = Depends(get_db)):
+    # Throttle before any database, hashing or email work
+    await enforce_rate_limit(request, "signup", user.email)
+
     # Check if username exists in verified users
-    if db.query(DbUser).filter(DbUser.username == user.username).first():
+    if await db.scalar(select(DbUser.id).where(DbUser.username == user.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
 
     # Check if email exists in verified users
-    if db.query(DbUser).filter(DbUser.email == user.email).first():
+    if await db.scalar(select(DbUser.id).where(DbUser.email == user.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Check if email exists in unverified users
-    if user.email in unverified_users:
-        user_data = unverified_users[user.email]
-        # If OTP is expired, allow new registration
-        if is_otp_expired(user_data["timestamp"]):
-            unverified_users.pop(user.email)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered but not verified. Please check your email for verification code. If you haven't received the code or it has expired, please register again."
-            )
+    # Check if email has a pending signup; expired ones may register again
+    if await signup_store.get(db, user.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered but not verified. Please check your email for verification code. If you haven't received the code or it has expired, please register again."
+        )
 
     # Generate OTP
     otp = generate_otp()
 
-    # Store user data temporarily with timestamp
-    unverified_users[user.email] = {
-        "name": user.name,
-        "username": user.username,
-        "email": user.email,
-        "password": user.password,
-        "verification_code": otp,
-        "timestamp": datetime.now(timezone.utc)
-    }
+    # Keep the signup until it is verified; only the password hash is stored
+    pending = PendingSignup(
+        email=user.email,
+        name=user.name,
+        username=user.username,
+        hashed_password=await password_hasher.hash(user.password),
+        verification_code=otp,
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=OTP_EXPIRY_MINUTES)
+    )
 
-    # Send verification email
-    email_sent = send_verification_email(user.email, otp)
-    if not email_sent:
-        # Remove from unverified users if email sending fails
-        unverified_users.pop(user.email, None)
+    # Queue the verification email; the outbox worker delivers it
+    try:
+        await signup_store.put(db, pending)
+        queue_verification_email(db, user.email, otp)
+        await db.commit()
+    except PendingSignupStoreFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many signups awaiting verification. Please try again in a few minutes."
+        )
+    except Exception:
+        await db.rollback()
+        # Forget the pending signup if the email could not be queued
+        await signup_store.pop(db, user.email)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to send verification email. Please try registering again."
         )
+    outbox_worker.notify()
 
     return {
         "message": "Signup successful! Please check your email for verification code. If you don't receive the code or it expires, please register again."
@@ -104,25 +118,19 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/verify-email", status_code=status.HTTP_200_OK)
-async def verify_email(verify_data: VerifyEmail, db: Session = Depends(get_db)):
-    # Check if email exists in unverified users
-    if verify_data.email not in unverified_users:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found or already verified. Please register again if you haven't completed the verification process."
-        )
+async def verify_email(request: Request, verify_data: VerifyEmail, db: AsyncSession = Depends(get_db)):
+    # Also limits guessing of verification codes
+    await enforce_rate_limit(request, "verify-email", verify_data.email)
 
-    user_data = unverified_users[verify_data.email]
-
-    # Check if OTP has expired
-    if is_otp_expired(user_data["timestamp"]):
-        unverified_users.pop(verify_data.email)
+    # Expired signups are not returned by the store
+    pending = await signup_store.get(db, verify_data.email)
+    if pending is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OTP has expired. Please register again to receive a new verification code."
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found, already verified or the verification code has expired. Please register again if you haven't completed the verification process."
         )
 
-    if user_data["verification_code"] != verify_data.verification_code:
+    if pending.verification_code != verify_data.verification_code:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code"
@@ -130,29 +138,32 @@ async def verify_email(verify_data: VerifyEmail, db: Session = Depends(get_db)):
 
     # Create verified user in database
     db_user = DbUser(
-        name=user_data["name"],
-        username=user_data["username"],
-        email=user_data["email"],
-        hashed_password=get_password_hash(user_data["password"]),
+        name=pending.name,
+        username=pending.username,
+        email=pending.email,
+        hashed_password=pending.hashed_password,
         is_verified=True
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    # Remove from unverified users after successful verification
-    unverified_users.pop(verify_data.email)
+    # Remove the pending signup together with creating the user
+    await signup_store.pop(db, verify_data.email)
+    await db.commit()
+    await db.refresh(db_user)
 
     return {"message": "Email verified successfully"}
 
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Throttle credential stuffing before it reaches bcrypt
+    await enforce_rate_limit(request, "login", form_data.username)
+
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models import DbContact
 from schemas.contact import ContactCreate, ContactResponse
-from typing import List
+from typing import List, Optional
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, parse_fields
 
 router = APIRouter(
     prefix="/contact",
     tags=["Contact"]
 )
 
+CONTACT_FIELDS = list(ContactResponse.model_fields)
+
 
 @router.post("/get_in_touch", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_message(
     contact: ContactCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Convert the Pydantic model to SQLAlchemy model
@@ -27,13 +32,13 @@ async def create_message(
 
         # Add to database
         db.add(db_contact)
-        db.commit()
-        db.refresh(db_contact)
+        await db.commit()
+        await db.refresh(db_contact)
 
         return db_contact
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save message: {str(e)}"
@@ -41,10 +46,28 @@ async def create_message(
 
 
 @router.get("/messages", response_model=List[ContactResponse])
-async def get_all_messages(db: Session = Depends(get_db)):
+async def get_all_messages(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(
+        None, description="Last message id of the previous page"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    projection = parse_fields(fields, CONTACT_FIELDS)
     try:
-        messages = db.query(DbContact).all()
-        return messages
+        # Select only the requested columns; rows are returned as-is
+        columns = [getattr(DbContact, field)
+                   for field in projection or CONTACT_FIELDS]
+        rows, next_cursor = await keyset_page(
+            db, select(*columns), DbContact.id, after, limit)
+
+        headers = {NEXT_CURSOR_HEADER: str(
+            next_cursor)} if next_cursor is not None else {}
+        return JSONResponse(
+            content=[dict(row._mapping) for row in rows],
+            headers=headers
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import column, delete, func, literal_column, or_, select, table, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
 from database import get_db
-from models import DbDoctor
-from schemas.doctor import DoctorCreate, DoctorResponse, DepartmentResponse, SpecialitySchema
+from models import DbAppointment, DbDoctor, DbDoctorBookingStats, DbSpeciality, DbUser, DbWorkingHours
+from schemas.doctor import (
+    DoctorCreate, DoctorImportReport, DoctorResponse, DoctorSlotsResponse, DepartmentResponse,
+    SpecialitySchema, WorkingHoursSchema
+)
+from schemas.appointment import DoctorAppointment
 from routers.auth import oauth2_scheme
-from typing import List
+from typing import Callable, Hashable, List, Optional
+from utils.appointment_utils import MAX_APPOINTMENT_LENGTH, clinic_day_start, format_appointment_time, to_utc
+from utils.cache import catalog_cache, etag_matches
+from utils.doctor_import import import_doctor_stream, iter_lines
+from utils.doctor_utils import fts_query, get_or_create_speciality, parse_experience_years, speciality_key
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, parse_fields
+from utils.slots import check_working_hours, compute_free_slots, load_working_template
+from utils.token_utils import get_current_staff
 
 
 router = APIRouter(
@@ -12,22 +28,65 @@ router = APIRouter(
     tags=["Doctors"]
 )
 
+doctor_list_adapter = TypeAdapter(List[DoctorResponse])
+DOCTOR_FIELDS = list(DoctorResponse.model_fields)
+
+# External-content FTS5 index over doctors.name and doctors.about (see utils/migrations.py)
+doctors_fts = table("doctors_fts", column("rowid"))
+
+# Accepted bulk import content types
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def doctor_projection(fields: List[str]) -> list:
+    """Map requested response fields to the columns that have to be selected."""
+    columns = []
+    for field in fields:
+        if field == "speciality":
+            columns.append(DbSpeciality.title.label("speciality_title"))
+            columns.append(DbSpeciality.icon.label("speciality_icon"))
+        else:
+            columns.append(getattr(DbDoctor, field))
+    return columns
+
+
+def projected_doctor(row, fields: List[str]) -> dict:
+    doctor = {}
+    for field in fields:
+        if field == "speciality":
+            doctor[field] = {"title": row.speciality_title,
+                             "icon": row.speciality_icon}
+        else:
+            doctor[field] = getattr(row, field)
+    return doctor
+
+
+async def cached_response(request: Request, key: Hashable, render: Callable) -> Response:
+    """Serve a catalog response from the cache, answering 304 when the client's ETag matches."""
+    entry = await catalog_cache.get_or_render(key, render)
+    headers = {"ETag": entry.etag, **dict(entry.headers)}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/department/{department_name}", response_model=List[DoctorResponse])
 async def get_doctors_by_department(
     department_name: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    try:
-        # First, let's get all doctors to see what we have
-        all_doctors = db.query(DbDoctor).all()
-
-        # Filter doctors based on speciality title
-        matching_doctors = []
-        for doctor in all_doctors:
-            if doctor.speciality and "title" in doctor.speciality:
-                if doctor.speciality["title"].lower() == department_name.lower():
-                    matching_doctors.append(doctor)
+    async def render() -> bytes:
+        # Indexed lookup on the case-folded speciality key
+        matching_doctors = (await db.scalars(
+            select(DbDoctor).join(DbDoctor.speciality).where(
+                DbSpeciality.key == speciality_key(department_name))
+        )).all()
 
         if not matching_doctors:
             raise HTTPException(
@@ -35,7 +94,12 @@ async def get_doctors_by_department(
                 detail=f"No doctors found in department: {department_name}"
             )
 
-        return matching_doctors
+        return doctor_list_adapter.dump_json(
+            doctor_list_adapter.validate_python(matching_doctors, from_attributes=True))
+
+    try:
+        return await cached_response(
+            request, ("department", speciality_key(department_name)), render)
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
@@ -47,25 +111,25 @@ async def get_doctors_by_department(
 
 @router.get("/department", response_model=DepartmentResponse)
 async def get_departments(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    try:
-        # Get all doctors and extract unique specialities
-        doctors = db.query(DbDoctor).all()
+    async def render() -> bytes:
+        # Only list specialities that at least one doctor belongs to
+        specialities = (await db.scalars(
+            select(DbSpeciality).where(DbSpeciality.doctors.any())
+            .order_by(DbSpeciality.title, DbSpeciality.icon)
+        )).all()
 
-        # Create a set to store unique departments (using tuple of title and icon)
-        unique_departments = set()
-        for doctor in doctors:
-            speciality = doctor.speciality
-            unique_departments.add((speciality["title"], speciality["icon"]))
-
-        # Convert to list of SpecialitySchema
         departments = [
-            SpecialitySchema(title=title, icon=icon)
-            for title, icon in sorted(unique_departments)
+            SpecialitySchema.model_validate(speciality)
+            for speciality in specialities
         ]
 
-        return {"departments": departments}
+        return DepartmentResponse(departments=departments).model_dump_json().encode()
+
+    try:
+        return await cached_response(request, ("departments",), render)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,19 +137,157 @@ async def get_departments(
         )
 
 
+def parse_search_cursor(after: Optional[str], ranked: bool):
+    """Decode a search cursor: "<id>" for filtered listings, "<rank>:<id>" for ranked ones."""
+    if after is None:
+        return None
+    try:
+        if ranked:
+            rank, doctor_id = after.split(":")
+            return float(rank), int(doctor_id)
+        return int(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("/search", response_model=List[DoctorResponse])
+async def search_doctors(
+    request: Request,
+    q: Optional[str] = Query(
+        None, description="Free-text search over name and about"),
+    speciality: Optional[str] = None,
+    available: Optional[bool] = None,
+    min_fee: Optional[int] = Query(None, ge=0),
+    max_fee: Optional[int] = Query(None, ge=0),
+    min_experience: Optional[int] = Query(
+        None, ge=0, description="Minimum years of experience"),
+    max_experience: Optional[int] = Query(
+        None, ge=0, description="Maximum years of experience"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(
+        None, description="X-Next-Cursor value of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    match = fts_query(q)
+    ranked = match is not None and db.bind.dialect.name == "sqlite"
+    cursor = parse_search_cursor(after, ranked)
+
+    async def render():
+        query = select(DbDoctor)
+
+        # Indexed filters
+        if speciality:
+            query = query.join(DbDoctor.speciality).where(
+                DbSpeciality.key == speciality_key(speciality))
+        if available is not None:
+            query = query.where(DbDoctor.available == available)
+        if min_fee is not None:
+            query = query.where(DbDoctor.fees >= min_fee)
+        if max_fee is not None:
+            query = query.where(DbDoctor.fees <= max_fee)
+        if min_experience is not None:
+            query = query.where(DbDoctor.experience_years >= min_experience)
+        if max_experience is not None:
+            query = query.where(DbDoctor.experience_years <= max_experience)
+
+        if ranked:
+            # Rank full-text matches with bm25 (lower is better), ties broken by id
+            fts_table = literal_column("doctors_fts")
+            matches = select(
+                doctors_fts.c.rowid.label("doctor_id"),
+                func.bm25(fts_table).label("rank")
+            ).where(fts_table.op("MATCH")(match)).subquery()
+            query = query.join(matches, matches.c.doctor_id == DbDoctor.id)
+            if cursor is not None:
+                query = query.where(
+                    tuple_(matches.c.rank, DbDoctor.id) > tuple_(*cursor))
+            rows = (await db.execute(
+                query.add_columns(matches.c.rank)
+                .order_by(matches.c.rank, DbDoctor.id).limit(limit + 1)
+            )).all()
+            doctors = [doctor for doctor, _ in rows[:limit]]
+            next_cursor = (f"{rows[limit - 1][1]!r}:{rows[limit - 1][0].id}"
+                           if len(rows) > limit else None)
+        else:
+            if q:
+                # Databases without FTS5 fall back to substring matching
+                pattern = f"%{q}%"
+                query = query.where(or_(DbDoctor.name.ilike(
+                    pattern), DbDoctor.about.ilike(pattern)))
+            doctors, next_cursor = await keyset_page(
+                db, query, DbDoctor.id, cursor, limit, scalars=True)
+
+        body = doctor_list_adapter.dump_json(
+            doctor_list_adapter.validate_python(doctors, from_attributes=True))
+        headers = {NEXT_CURSOR_HEADER: str(
+            next_cursor)} if next_cursor is not None else {}
+        return body, headers
+
+    cache_key = ("search", q, speciality and speciality_key(speciality), available,
+                 min_fee, max_fee, min_experience, max_experience, limit, after)
+    try:
+        return await cached_response(request, cache_key, render)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search doctors: {str(e)}"
+        )
+
+
+@router.get("/popular", response_model=List[DoctorResponse])
+async def get_popular_doctors(
+    request: Request,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Doctors ordered by number of bookings, most booked first.
+
+    Reads the maintained booking counters; like the rest of the catalog the
+    response is cached, so the order may lag bookings by up to
+    CATALOG_CACHE_TTL_SECONDS.
+    """
+    async def render():
+        bookings = func.coalesce(DbDoctorBookingStats.bookings, 0)
+        doctors = (await db.scalars(
+            select(DbDoctor)
+            .outerjoin(DbDoctorBookingStats, DbDoctorBookingStats.doctor_id == DbDoctor.id)
+            .order_by(bookings.desc(), DbDoctor.id)
+            .limit(limit)
+        )).all()
+        body = doctor_list_adapter.dump_json(
+            doctor_list_adapter.validate_python(doctors, from_attributes=True))
+        return body, {}
+
+    try:
+        return await cached_response(request, ("popular", limit), render)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch popular doctors: {str(e)}"
+        )
+
+
 @router.get("/{doctor_id}", response_model=DoctorResponse)
 async def get_doctor_by_id(
     doctor_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    try:
-        doctor = db.query(DbDoctor).filter(DbDoctor.id == doctor_id).first()
+    async def render() -> bytes:
+        doctor = await db.get(DbDoctor, doctor_id)
         if not doctor:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Doctor with id {doctor_id} not found"
             )
-        return doctor
+        return DoctorResponse.model_validate(doctor).model_dump_json().encode()
+
+    try:
+        return await cached_response(request, ("doctor", doctor_id), render)
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
@@ -95,11 +297,236 @@ async def get_doctor_by_id(
         )
 
 
+@router.get("/{doctor_id}/slots", response_model=DoctorSlotsResponse)
+async def get_doctor_slots(
+    doctor_id: int,
+    start: Optional[datetime] = Query(
+        None, alias="from", description="Range start (ISO 8601), defaults to now"),
+    end: Optional[datetime] = Query(
+        None, alias="to", description="Range end (ISO 8601), defaults to 7 days after the start"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Free appointment slots for a doctor, computed from their working hours and bookings.
+
+    Slots are never offered in the past; naive times are read as clinic-local time.
+    """
+    now = datetime.now(timezone.utc)
+    start = max(to_utc(start), now) if start else now
+    end = to_utc(end) if end else start + timedelta(days=7)
+    if end - start > timedelta(days=settings.MAX_SLOT_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Slot range cannot exceed {settings.MAX_SLOT_RANGE_DAYS} days"
+        )
+
+    try:
+        doctor = await db.get(DbDoctor, doctor_id)
+        if not doctor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Doctor with id {doctor_id} not found"
+            )
+
+        slots = await compute_free_slots(db, doctor_id, start, end) \
+            if doctor.available and start < end else []
+        return {
+            "doctor_id": doctor_id,
+            "slot_minutes": settings.APPOINTMENT_DURATION_MINUTES,
+            "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots]
+        }
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch slots: {str(e)}"
+        )
+
+
+@router.get("/{doctor_id}/appointments", response_model=List[DoctorAppointment])
+async def get_doctor_appointments(
+    doctor_id: int,
+    start: Optional[datetime] = Query(
+        None, alias="from", description="Range start (ISO 8601), defaults to the start of today"),
+    end: Optional[datetime] = Query(
+        None, alias="to", description="Range end (ISO 8601), defaults to 1 day after the start"),
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    A doctor's bookings overlapping a time window, with patient details, ordered by start.
+    Staff only, since it lists patients' names and emails.
+
+    Naive times are read as clinic-local time; "today" is the clinic-local day.
+    """
+    start = to_utc(start) if start else clinic_day_start(datetime.now(timezone.utc))
+    end = to_utc(end) if end else start + timedelta(days=1)
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range end must be after its start"
+        )
+    if end - start > timedelta(days=settings.MAX_SLOT_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Appointment range cannot exceed {settings.MAX_SLOT_RANGE_DAYS} days"
+        )
+
+    try:
+        await get_current_staff(token, db)
+
+        if not await db.get(DbDoctor, doctor_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Doctor with id {doctor_id} not found"
+            )
+
+        # Range scan on the (doctor_id, start) index, bounded below by the
+        # longest appointment so bookings already under way are included
+        rows = (await db.execute(
+            select(DbAppointment.id, DbAppointment.start, DbAppointment.end,
+                   DbUser.id.label("patient_id"), DbUser.name, DbUser.email)
+            .join(DbAppointment.user)
+            .where(
+                DbAppointment.doctor_id == doctor_id,
+                DbAppointment.start >= start - MAX_APPOINTMENT_LENGTH,
+                DbAppointment.start < end,
+                DbAppointment.end > start
+            )
+            .order_by(DbAppointment.start)
+        )).all()
+        return [
+            {
+                "id": row.id,
+                "start": row.start,
+                "end": row.end,
+                "date_time": format_appointment_time(row.start),
+                "patient": {"id": row.patient_id, "name": row.name, "email": row.email},
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch doctor appointments: {str(e)}"
+        )
+
+
+@router.get("/{doctor_id}/working-hours", response_model=List[WorkingHoursSchema])
+async def get_working_hours(
+    doctor_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Weekly working hours of a doctor (the configured default if none are set)."""
+    try:
+        if not await db.get(DbDoctor, doctor_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Doctor with id {doctor_id} not found"
+            )
+        template = await load_working_template(db, doctor_id)
+        return [
+            {"weekday": weekday, "start_time": opens, "end_time": closes}
+            for weekday, opens, closes in sorted(template)
+        ]
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch working hours: {str(e)}"
+        )
+
+
+@router.put("/{doctor_id}/working-hours", response_model=List[WorkingHoursSchema])
+async def set_working_hours(
+    doctor_id: int,
+    working_hours: List[WorkingHoursSchema],
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Replace a doctor's weekly working hours; an empty list restores the default. Staff only.
+
+    Windows may not overlap on the same weekday and must start on the slot
+    grid (a multiple of APPOINTMENT_DURATION_MINUTES after midnight).
+    """
+    await get_current_staff(token, db)
+    try:
+        check_working_hours(
+            [(entry.weekday, entry.start_time, entry.end_time) for entry in working_hours],
+            timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    try:
+        if not await db.get(DbDoctor, doctor_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Doctor with id {doctor_id} not found"
+            )
+
+        await db.execute(delete(DbWorkingHours).where(DbWorkingHours.doctor_id == doctor_id))
+        db.add_all([
+            DbWorkingHours(doctor_id=doctor_id, **entry.model_dump())
+            for entry in working_hours
+        ])
+        await db.commit()
+
+        return await get_working_hours(doctor_id, db)
+    except Exception as e:
+        await db.rollback()
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update working hours: {str(e)}"
+        )
+
+
 @router.get("", response_model=List[DoctorResponse])
-async def get_all_doctors(db: Session = Depends(get_db)):
+async def get_all_doctors(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(
+        None, description="Last doctor id of the previous page"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    projection = parse_fields(fields, DOCTOR_FIELDS)
+
+    async def render():
+        if projection is None:
+            doctors, next_cursor = await keyset_page(
+                db, select(DbDoctor), DbDoctor.id, after, limit, scalars=True)
+            body = doctor_list_adapter.dump_json(
+                doctor_list_adapter.validate_python(doctors, from_attributes=True))
+        else:
+            query = select(*doctor_projection(projection))
+            if "speciality" in projection:
+                query = query.join(DbDoctor.speciality)
+            rows, next_cursor = await keyset_page(
+                db, query, DbDoctor.id, after, limit)
+            body = json.dumps(
+                [projected_doctor(row, projection) for row in rows],
+                separators=(",", ":")
+            ).encode()
+
+        headers = {NEXT_CURSOR_HEADER: str(
+            next_cursor)} if next_cursor is not None else {}
+        return body, headers
+
+    cache_key = ("doctors", limit, after,
+                 tuple(projection) if projection else None)
     try:
-        doctors = db.query(DbDoctor).all()
-        return doctors
+        return await cached_response(request, cache_key, render)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,9 +537,10 @@ async def get_all_doctors(db: Session = Depends(get_db)):
 @router.post("", response_model=DoctorResponse, status_code=status.HTTP_201_CREATED)
 async def create_doctor(
     doctor: DoctorCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
+    await get_current_staff(token, db)
     try:
         # Convert the Pydantic model to SQLAlchemy model
         db_doctor = DbDoctor(
@@ -121,22 +549,66 @@ async def create_doctor(
             address=doctor.address.model_dump(),
             degree=doctor.degree,
             experience=doctor.experience,
+            experience_years=parse_experience_years(doctor.experience),
             fees=doctor.fees,
             image=doctor.image,
-            speciality=doctor.speciality.model_dump(),
+            speciality=await db.run_sync(
+                get_or_create_speciality, doctor.speciality.title, doctor.speciality.icon),
             available=doctor.available
         )
 
         # Add to database
         db.add(db_doctor)
-        db.commit()
-        db.refresh(db_doctor)
+        await db.commit()
+        await db.refresh(db_doctor)
+
+        # Cached catalog responses no longer reflect the database
+        catalog_cache.invalidate()
 
         return db_doctor
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create doctor: {str(e)}"
         )
+
+
+@router.post("/bulk", response_model=DoctorImportReport)
+async def bulk_import_doctors(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Import doctors from a streamed NDJSON (one DoctorCreate object per line) or
+    CSV body. CSV files use a header row with the DoctorCreate fields, where
+    address and speciality are flattened into address_line1, address_line2,
+    speciality_title and speciality_icon.
+
+    Only staff may import doctors.
+    """
+    await get_current_staff(token, db)
+    content_type = request.headers.get(
+        "content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    try:
+        report = await import_doctor_stream(db, iter_lines(request.stream()), fmt)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import doctors: {str(e)}"
+        )
+    finally:
+        # Batches committed before a failure are visible too
+        catalog_cache.invalidate()
+
+    return report
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from utils.cache import catalog_cache
+from utils.outbox import outbox_worker
+from utils.password_utils import password_hasher
+from utils.rate_limit import rate_limiter
+from utils.reminders import reminder_scheduler
+from utils.signup_store import signup_store
+from utils.smtp_pool import smtp_pool
+from utils.token_utils import principal_cache
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+
+@router.get("")
+async def get_metrics():
+    """Per-worker counters used to size caches and pools."""
+    return {
+        "catalog_cache": catalog_cache.stats(),
+        "email_outbox": outbox_worker.stats(),
+        "password_hasher": password_hasher.stats(),
+        "pending_signups": signup_store.stats(),
+        "principal_cache": principal_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "reminders": reminder_scheduler.stats(),
+        "smtp_pool": smtp_pool.stats()
+    }
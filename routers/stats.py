@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_db
+from models import DbDepartmentDailyBookings, DbDoctor, DbDoctorBookingStats, DbSpeciality
+from schemas.stats import DepartmentDailyBookingCount, DoctorBookingCount
+from utils.booking_stats import booking_day
+
+# Longest range of days served by one daily-bookings request
+MAX_STATS_RANGE_DAYS = 366
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Statistics"]
+)
+
+
+@router.get("/doctors/top", response_model=List[DoctorBookingCount])
+async def get_top_doctors(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Doctors with the most bookings, read from the maintained per-doctor counters."""
+    try:
+        rows = (await db.execute(
+            select(DbDoctorBookingStats.doctor_id, DbDoctorBookingStats.bookings,
+                   DbDoctor.name, DbSpeciality.title.label("speciality"))
+            .join(DbDoctor, DbDoctor.id == DbDoctorBookingStats.doctor_id)
+            .join(DbDoctor.speciality)
+            .where(DbDoctorBookingStats.bookings > 0)
+            .order_by(DbDoctorBookingStats.bookings.desc(), DbDoctorBookingStats.doctor_id)
+            .limit(limit)
+        )).all()
+        return [dict(row._mapping) for row in rows]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch top doctors: {str(e)}"
+        )
+
+
+@router.get("/departments/daily", response_model=List[DepartmentDailyBookingCount])
+async def get_department_daily_bookings(
+    start: Optional[date] = Query(
+        None, alias="from", description="First appointment day, defaults to today"),
+    end: Optional[date] = Query(
+        None, alias="to", description="Last appointment day (inclusive), defaults to 6 days after the first"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bookings per department and clinic-local appointment day, read from the daily aggregates."""
+    start = start or booking_day(datetime.now(timezone.utc))
+    end = end or start + timedelta(days=6)
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range end must not be before its start"
+        )
+    if (end - start).days >= MAX_STATS_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_STATS_RANGE_DAYS} days"
+        )
+
+    try:
+        rows = (await db.execute(
+            select(DbSpeciality.title.label("department"),
+                   DbDepartmentDailyBookings.day, DbDepartmentDailyBookings.bookings)
+            .join(DbSpeciality, DbSpeciality.id == DbDepartmentDailyBookings.speciality_id)
+            .where(DbDepartmentDailyBookings.day >= start,
+                   DbDepartmentDailyBookings.day <= end,
+                   DbDepartmentDailyBookings.bookings > 0)
+            .order_by(DbDepartmentDailyBookings.day, DbSpeciality.title)
+        )).all()
+        return [dict(row._mapping) for row in rows]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch daily bookings: {str(e)}"
+        )
@@ -1,7 +1,11 @@
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from config import settings
 from database import get_db
-from models import DbDoctor
+from models import DbAppointment
 from schemas.user import UserWithAppointments
 from schemas.appointment import AppointmentDetail
 from utils.token_utils import get_current_user
@@ -16,18 +20,32 @@ router = APIRouter(
 
 @router.get("/profile", response_model=UserWithAppointments)
 async def get_user_profile(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
     # Get current user
     current_user = await get_current_user(token, db)
 
     try:
-        # Get appointments with doctor details
+        now = datetime.now(timezone.utc)
+
+        # Appointment counts instead of the full history
+        total, upcoming = (await db.execute(
+            select(func.count(), func.coalesce(func.sum(case((DbAppointment.start >= now, 1), else_=0)), 0))
+            .where(DbAppointment.user_id == current_user.id)
+        )).one()
+
+        # Only the next few appointments, with doctor details in a single joined query
         appointments = []
-        for appt in current_user.appointments:
-            doctor = db.query(DbDoctor).filter(
-                DbDoctor.id == appt.doctor_id).first()
+        user_appointments = await db.scalars(
+            select(DbAppointment)
+            .options(joinedload(DbAppointment.doctor))
+            .where(DbAppointment.user_id == current_user.id, DbAppointment.start >= now)
+            .order_by(DbAppointment.start, DbAppointment.id)
+            .limit(settings.PROFILE_UPCOMING_APPOINTMENTS)
+        )
+        for appt in user_appointments:
+            doctor = appt.doctor
             if doctor:
                 # Format address
                 address_dict = doctor.address
@@ -36,8 +54,10 @@ async def get_user_profile(
                 # Create appointment detail
                 appointment_detail = AppointmentDetail(
                     doctor_name=doctor.name,
-                    speciality=doctor.speciality["title"],
+                    speciality=doctor.speciality.title,
                     address=address,
+                    start=appt.start,
+                    end=appt.end,
                     date_time=appt.date_time,
                     image=doctor.image
                 )
@@ -49,7 +69,9 @@ async def get_user_profile(
             name=current_user.name,
             username=current_user.username,
             email=current_user.email,
-            appointments=appointments
+            appointments=appointments,
+            upcoming_appointments=upcoming,
+            past_appointments=total - upcoming
         )
 
         return response
@@ -1,11 +1,14 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, field_validator, model_validator
 from typing import Optional
 from schemas.doctor import DoctorResponse
+from utils.appointment_utils import MAX_APPOINTMENT_LENGTH, default_end, to_utc
 
 
 class AppointmentBase(BaseModel):
     doctor_id: int
-    date_time: str
+    start: datetime
+    end: Optional[datetime] = None
 
     model_config = {
         "from_attributes": True
@@ -13,14 +16,35 @@ class AppointmentBase(BaseModel):
 
 
 class AppointmentCreate(AppointmentBase):
-    pass
+    """
+    ISO 8601 start (and optional end) of the appointment. Times without an
+    offset are read as clinic-local time; `end` defaults to the standard
+    appointment duration.
+    """
+
+    @field_validator("start", "end")
+    @classmethod
+    def normalize_timezone(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_utc(value) if value is not None else None
+
+    @model_validator(mode="after")
+    def check_end(self):
+        if self.end is None:
+            self.end = default_end(self.start)
+        elif self.end <= self.start:
+            raise ValueError("end must be after start")
+        elif self.end - self.start > MAX_APPOINTMENT_LENGTH:
+            raise ValueError("appointments cannot be longer than 24 hours")
+        return self
 
 
 class Appointment(BaseModel):
     id: int
     user_id: int
     doctor_id: int
-    date_time: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    date_time: Optional[str] = None
 
     model_config = {
         "from_attributes": True
@@ -31,7 +55,9 @@ class AppointmentDetail(BaseModel):
     doctor_name: str
     speciality: str
     address: str
-    date_time: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    date_time: Optional[str] = None
     image: Optional[str] = None
 
     model_config = {
@@ -41,9 +67,25 @@ class AppointmentDetail(BaseModel):
 
 class AppointmentWithDoctor(BaseModel):
     id: int
-    date_time: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    date_time: Optional[str] = None
     doctor: DoctorResponse
 
     model_config = {
         "from_attributes": True
     }
+
+
+class PatientSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+
+
+class DoctorAppointment(BaseModel):
+    id: int
+    start: datetime
+    end: datetime
+    date_time: Optional[str] = None
+    patient: PatientSummary
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from datetime import datetime, time
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 
 
@@ -43,15 +44,55 @@ class DoctorCreate(BaseModel):
 class DoctorResponse(BaseModel):
     id: int
     name: str
-    about: str
+    # Optional on create and import, so stored doctors may lack them
+    about: Optional[str] = None
     address: AddressSchema
     degree: str
     experience: str
     fees: int
-    image: str
+    image: Optional[str] = None
     speciality: SpecialitySchema
     available: bool
 
     model_config = {
         "from_attributes": True
     }
+
+
+class DoctorImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class DoctorImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[DoctorImportError]
+    errors_truncated: bool = False
+
+
+class WorkingHoursSchema(BaseModel):
+    weekday: int = Field(..., ge=0, le=6, description="0 = Monday")
+    start_time: time
+    end_time: time
+
+    model_config = {
+        "from_attributes": True
+    }
+
+    @model_validator(mode="after")
+    def check_times(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class SlotSchema(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class DoctorSlotsResponse(BaseModel):
+    doctor_id: int
+    slot_minutes: int
+    slots: List[SlotSchema]
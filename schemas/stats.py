@@ -0,0 +1,15 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class DoctorBookingCount(BaseModel):
+    doctor_id: int
+    name: str
+    speciality: str
+    bookings: int
+
+
+class DepartmentDailyBookingCount(BaseModel):
+    department: str
+    day: date
+    bookings: int
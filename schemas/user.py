@@ -27,7 +27,13 @@ class User(UserBase):
 
 
 class UserWithAppointments(User):
+    """
+    Profile summary: the next few upcoming appointments and appointment counts.
+    The full history is paginated under GET /appointments.
+    """
     appointments: List[AppointmentDetail] = []
+    upcoming_appointments: int = 0
+    past_appointments: int = 0
 
     model_config = {
         "from_attributes": True,
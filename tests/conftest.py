@@ -0,0 +1,38 @@
+"""Shared fixtures: the API wired to a throwaway SQLite database."""
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from database import get_db
+from main import app
+from utils.cache import catalog_cache
+from utils.migrations import run_migrations
+from utils.token_utils import principal_cache
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    A migrated database in `tmp_path` that API requests use instead of the
+    configured one. Yields its sync `engine` (for setting up data) and the
+    `async_engine` behind the request sessions.
+    """
+    path = tmp_path / "api.db"
+    engine = create_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    # Tests run each request batch in its own event loop, so keep no connections between them
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    sessions = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield SimpleNamespace(engine=engine, async_engine=async_engine)
+    app.dependency_overrides.pop(get_db, None)
+    # Cached users and doctors belong to this database only
+    principal_cache.clear()
+    catalog_cache.invalidate()
+    engine.dispose()
@@ -0,0 +1,52 @@
+"""Claims on Idempotency-Keys whose request never finished."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models import DbIdempotencyKey
+from utils.idempotency import IdempotencyKeyInProgressError, claim_idempotency_key, claim_lapsed
+
+
+async def lapse_claims(db: AsyncSession) -> None:
+    """Age every claim past its lease, as if the worker holding it had died."""
+    lapsed = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.IDEMPOTENCY_KEY_LEASE_SECONDS + 1)
+    await db.execute(update(DbIdempotencyKey).values(claimed_at=lapsed))
+    await db.commit()
+
+
+def test_lapsed_claim_can_be_taken_over(database):
+    async def run():
+        async with AsyncSession(database.async_engine) as db:
+            assert await claim_idempotency_key(db, 1, "retry-me", "body") is None
+            # Still running: retries are refused
+            with pytest.raises(IdempotencyKeyInProgressError):
+                await claim_idempotency_key(db, 1, "retry-me", "body")
+
+            await lapse_claims(db)
+
+            assert await claim_idempotency_key(db, 1, "retry-me", "body") is None
+            # The new claim holds a fresh lease
+            with pytest.raises(IdempotencyKeyInProgressError):
+                await claim_idempotency_key(db, 1, "retry-me", "body")
+
+    asyncio.run(run())
+
+
+def test_lapsed_claim_is_taken_over_by_one_retry(database):
+    async def run():
+        async with AsyncSession(database.async_engine) as first, \
+                AsyncSession(database.async_engine) as second:
+            assert await claim_idempotency_key(first, 1, "retry-me", "body") is None
+            await lapse_claims(first)
+            # `first` read the lapsed claim just before `second` takes it over
+            stale = await first.scalar(select(DbIdempotencyKey))
+            assert claim_lapsed(stale, datetime.now(timezone.utc))
+
+            assert await claim_idempotency_key(second, 1, "retry-me", "body") is None
+            with pytest.raises(IdempotencyKeyInProgressError):
+                await claim_idempotency_key(first, 1, "retry-me", "body")
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+"""Upgrading databases that hold legacy appointments the migrations cannot parse."""
+import pytest
+from sqlalchemy import create_engine, text
+from database import Base
+from utils.migrations import run_migrations
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database whose appointments still use the free-form date_time column."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE appointments"))
+        conn.execute(text(
+            "CREATE TABLE appointments (id INTEGER PRIMARY KEY, user_id INTEGER, "
+            "doctor_id INTEGER, date_time VARCHAR)"))
+        conn.execute(text(
+            "INSERT INTO specialities (id, title, icon, key) "
+            "VALUES (1, 'Cardiology', 'faHeartPulse', 'cardiology')"))
+        conn.execute(text(
+            "INSERT INTO doctors (id, name, address, available, degree, experience, fees, "
+            "speciality_id) VALUES (1, 'Dr. Richard James', '{}', 1, 'MBBS', '4 Years', 50, 1)"))
+        conn.execute(text(
+            "INSERT INTO users (id, name, username, email, hashed_password, is_verified, is_staff) "
+            "VALUES (1, 'Jane Doe', 'jane', 'jane@example.com', '!', 1, 0)"))
+        conn.execute(text(
+            "INSERT INTO appointments (id, user_id, doctor_id, date_time) "
+            "VALUES (1, 1, 1, 'Tue 18 | 13:00'), (2, 1, 1, 'sometime next week')"))
+    yield engine
+    engine.dispose()
+
+
+def test_unparseable_legacy_time_is_quarantined(legacy_engine):
+    run_migrations(legacy_engine)
+    # Migrations are idempotent; a second run must not fail either
+    run_migrations(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        appointments = conn.execute(text("SELECT id, start FROM appointments")).all()
+        quarantined = conn.execute(text(
+            "SELECT appointment_id, date_time, start, reason FROM quarantined_appointments")).all()
+        stats = conn.execute(text("SELECT doctor_id, bookings FROM doctor_booking_stats")).all()
+
+    assert [row.id for row in appointments] == [1]
+    assert appointments[0].start is not None
+    assert quarantined == [(2, "sometime next week", None, "unparseable date_time")]
+    assert stats == [(1, 1)]
+
@@ -0,0 +1,73 @@
+"""The appointment history endpoints must not issue more queries as appointments grow."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from main import app
+from models import DbAppointment, DbDoctor, DbSpeciality, DbUser
+from utils.token_utils import create_access_token
+
+APPOINTMENT_COUNTS = (1, 5, 25)
+
+
+def create_patient(engine) -> DbUser:
+    with Session(engine, expire_on_commit=False) as db:
+        user = DbUser(name="Query Count", username="query-count",
+                      email="query-count@example.com", hashed_password="!", is_verified=True)
+        db.add(user)
+        db.commit()
+        return user
+
+
+def book_appointments(engine, user: DbUser, count: int) -> None:
+    """Give `user` `count` appointments, each with a different doctor."""
+    with Session(engine) as db:
+        speciality = db.query(DbSpeciality).first() or DbSpeciality(
+            title="Cardiology", icon="faHeartPulse", key="cardiology")
+        existing = db.query(DbAppointment).filter(DbAppointment.user_id == user.id).count()
+        start = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+        for i in range(existing, count):
+            doctor = DbDoctor(name=f"Dr. {i}", degree="MBBS", experience="4 Years", fees=50,
+                              address={"line1": "17th Cross, Richmond", "line2": "Circle, Ring Road, London"},
+                              speciality=speciality)
+            db.add(DbAppointment(user_id=user.id, doctor=doctor,
+                                 start=start + timedelta(days=i),
+                                 end=start + timedelta(days=i, minutes=30)))
+        db.commit()
+
+
+async def count_queries(client: httpx.AsyncClient, async_engine, path: str, headers: dict) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", ["/appointments", "/users/profile"])
+def test_query_count_does_not_grow_with_appointments(database, path):
+    user = create_patient(database.engine)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+    async def run():
+        counts = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                     base_url="http://test") as client:
+            # Load the user into the principal cache so every measured request sees it
+            (await client.get(path, headers=headers)).raise_for_status()
+            for appointments in APPOINTMENT_COUNTS:
+                book_appointments(database.engine, user, appointments)
+                counts.append(await count_queries(client, database.async_engine, path, headers))
+        return counts
+
+    counts = asyncio.run(run())
+    assert len(set(counts)) == 1, dict(zip(APPOINTMENT_COUNTS, counts))
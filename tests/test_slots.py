@@ -0,0 +1,66 @@
+"""Slots offered by GET /doctors/{id}/slots can be booked."""
+import asyncio
+from datetime import datetime, time, timedelta
+import httpx
+import pytest
+from sqlalchemy.orm import Session
+from config import settings
+from main import app
+from models import DbDoctor, DbSpeciality, DbUser, DbWorkingHours
+from utils.appointment_utils import clinic_timezone
+from utils.slots import check_working_hours
+from utils.token_utils import create_access_token
+
+
+def create_doctor_and_patient(engine):
+    """A doctor working 09:00-17:00 every day, and a patient; returns their ids."""
+    with Session(engine) as db:
+        doctor = DbDoctor(
+            name="Dr. Richard James", degree="MBBS", experience="4 Years", fees=50,
+            address={"line1": "17th Cross, Richmond", "line2": "Circle, Ring Road, London"},
+            speciality=DbSpeciality(title="Cardiology", icon="faHeartPulse", key="cardiology"),
+            working_hours=[DbWorkingHours(weekday=weekday, start_time=time(9), end_time=time(17))
+                           for weekday in range(7)])
+        patient = DbUser(name="Jane Doe", username="jane", email="jane@example.com",
+                         hashed_password="!", is_verified=True)
+        db.add_all([doctor, patient])
+        db.commit()
+        return doctor.id, patient.username
+
+
+def test_slot_listed_from_mid_slot_can_be_booked(database):
+    doctor_id, username = create_doctor_and_patient(database.engine)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+    slot = timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+    opens = datetime.combine(datetime.now(clinic_timezone()).date() + timedelta(days=1),
+                             time(9), tzinfo=clinic_timezone())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                     base_url="http://test") as client:
+            response = await client.get(f"/doctors/{doctor_id}/slots", params={
+                "from": (opens + slot / 2).isoformat(), "to": (opens + 4 * slot).isoformat()})
+            response.raise_for_status()
+            first = response.json()["slots"][0]
+            booking = await client.post("/appointments/", headers=headers, json={
+                "doctor_id": doctor_id, "start": first["start"], "end": first["end"]})
+            return first, booking
+
+    first, booking = asyncio.run(run())
+    assert booking.status_code == 200, booking.text
+    # The slot grid stays anchored at 09:00, not at the requested `from`
+    assert datetime.fromisoformat(first["start"]) == opens + slot
+
+
+def test_working_hours_on_one_grid_are_accepted():
+    check_working_hours([(0, time(9), time(12)), (0, time(13, 30), time(17)),
+                         (1, time(9), time(12))], timedelta(minutes=30))
+
+
+@pytest.mark.parametrize("template", [
+    [(0, time(9), time(12)), (0, time(11, 30), time(14))],
+    [(0, time(9, 10), time(12))],
+], ids=["overlapping", "off-grid"])
+def test_working_hours_off_one_grid_are_rejected(template):
+    with pytest.raises(ValueError):
+        check_working_hours(template, timedelta(minutes=30))
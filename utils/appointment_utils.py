@@ -0,0 +1,79 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+from config import settings
+
+# Legacy free-form appointment times, e.g. "Tue 18 | 13:00"
+LEGACY_DATE_TIME = re.compile(
+    r"^\s*(?P<weekday>[A-Za-z]{3})[A-Za-z]*\s+(?P<day>\d{1,2})\s*\|\s*(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*$")
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# Longest allowed appointment; bounds range scans on the (doctor_id, start) index
+MAX_APPOINTMENT_LENGTH = timedelta(hours=24)
+
+
+def clinic_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.APPOINTMENT_TIMEZONE)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Convert a datetime to UTC, reading naive values as clinic-local time."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=clinic_timezone())
+    return value.astimezone(timezone.utc)
+
+
+def clinic_day_start(value: datetime) -> datetime:
+    """Midnight (in UTC) of the clinic-local day containing `value`."""
+    local = value.astimezone(clinic_timezone())
+    return datetime.combine(local.date(), time(), tzinfo=local.tzinfo).astimezone(timezone.utc)
+
+
+def default_end(start: datetime) -> datetime:
+    return start + timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+
+
+def format_appointment_time(start: Optional[datetime]) -> Optional[str]:
+    """Render a start time in the human-readable form used in emails, e.g. "Tue 18 | 13:00"."""
+    if start is None:
+        return None
+    local = start.astimezone(clinic_timezone())
+    return f"{local:%a} {local.day} | {local:%H:%M}"
+
+
+def parse_legacy_date_time(value: str, reference: datetime) -> datetime:
+    """
+    Parse a legacy "Tue 18 | 13:00" string into an aware UTC datetime.
+
+    The string carries no month or year, so the result is the date closest to
+    `reference` whose day of month falls on the given weekday.
+
+    Raises:
+        ValueError: If the string cannot be parsed or no such date exists
+    """
+    match = LEGACY_DATE_TIME.match(value or "")
+    if not match or match["weekday"].lower() not in WEEKDAYS:
+        raise ValueError(f"Unrecognised appointment time: {value!r}")
+
+    weekday = WEEKDAYS.index(match["weekday"].lower())
+    day = int(match["day"])
+    local_reference = reference.astimezone(clinic_timezone()).date()
+
+    # Consider the matching day in every month within 14 months of the reference
+    candidates = []
+    for offset in range(-14, 15):
+        month_index = local_reference.year * 12 + local_reference.month - 1 + offset
+        try:
+            candidate = date(month_index // 12, month_index % 12 + 1, day)
+        except ValueError:
+            continue
+        if candidate.weekday() == weekday:
+            candidates.append(candidate)
+    if not candidates:
+        raise ValueError(f"No date matches appointment time: {value!r}")
+
+    closest = min(candidates, key=lambda d: abs(d - local_reference))
+    local = datetime(closest.year, closest.month, closest.day,
+                     int(match["hour"]), int(match["minute"]), tzinfo=clinic_timezone())
+    return local.astimezone(timezone.utc)
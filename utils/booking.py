@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models import DbAppointment
+from utils.booking_stats import record_booking
+from utils.slots import booked_intervals, load_working_template, working_windows
+
+
+class InvalidSlotError(ValueError):
+    """The requested time is not one of the doctor's appointment slots."""
+
+
+class SlotUnavailableError(Exception):
+    """The requested slot is already booked."""
+
+
+async def check_slot(db: AsyncSession, doctor_id: int, start: datetime, end: datetime) -> None:
+    """
+    Check that [start, end) is exactly one slot of the doctor's working hours.
+
+    Bookings have to line up with the slot grid served by
+    GET /doctors/{id}/slots. The unique (doctor_id, start) index only rules
+    out overlapping bookings while every slot is on one fixed grid: windows
+    that do not overlap and start a whole number of slots after midnight
+    (enforced when working hours are set) and an unchanged
+    APPOINTMENT_DURATION_MINUTES. Otherwise two bookings with different
+    starts can overlap, and only the racy read in book_appointment stops them.
+
+    Raises:
+        InvalidSlotError: If the time is in the past or not on the slot grid
+    """
+    slot = timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+    if start < datetime.now(timezone.utc):
+        raise InvalidSlotError("Cannot book an appointment in the past")
+    if end - start != slot:
+        raise InvalidSlotError(
+            f"Appointments must be {settings.APPOINTMENT_DURATION_MINUTES} minutes long")
+
+    windows = working_windows(await load_working_template(db, doctor_id), start, end)
+    for window_start, window_end in windows:
+        if window_start <= start and end <= window_end:
+            if (start - window_start) % slot:
+                break
+            return
+    raise InvalidSlotError(
+        "Requested time is not an available slot for this doctor")
+
+
+async def book_appointment(
+    db: AsyncSession,
+    user_id: int,
+    doctor_id: int,
+    start: datetime,
+    end: datetime
+) -> DbAppointment:
+    """
+    Reserve a slot for a user in the session's current transaction.
+
+    The booking is flushed but not committed, so the caller can add related
+    rows (such as the confirmation email) and commit them atomically together
+    with the booking statistics updated here. The read
+    of existing bookings only gives a fast answer for the common case; the
+    unique (doctor_id, start) index decides concurrent races, and the losing
+    INSERT is reported the same way.
+
+    Raises:
+        InvalidSlotError: If the time is not a valid slot
+        SlotUnavailableError: If the slot is already booked
+    """
+    await check_slot(db, doctor_id, start, end)
+    if await booked_intervals(db, doctor_id, start, end):
+        raise SlotUnavailableError("This slot is already booked")
+
+    appointment = DbAppointment(
+        user_id=user_id,
+        doctor_id=doctor_id,
+        start=start,
+        end=end
+    )
+    db.add(appointment)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise SlotUnavailableError("This slot is already booked")
+
+    await record_booking(db, doctor_id, start)
+    return appointment
+
+
+async def cancel_appointment(db: AsyncSession, appointment: DbAppointment) -> None:
+    """
+    Delete an appointment and uncount it, in the session's current transaction.
+
+    Raises:
+        InvalidSlotError: If the appointment has already started
+    """
+    if appointment.start <= datetime.now(timezone.utc):
+        raise InvalidSlotError("Cannot cancel an appointment that has already started")
+
+    await db.delete(appointment)
+    await record_booking(db, appointment.doctor_id, appointment.start, delta=-1)
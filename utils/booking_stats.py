@@ -0,0 +1,111 @@
+"""
+Incrementally maintained booking statistics.
+
+`doctor_booking_stats` and `department_daily_bookings` are updated in the same
+transaction that books or cancels an appointment, so the statistics endpoints
+read small aggregate tables instead of scanning `appointments`. Days are
+clinic-local appointment days (APPOINTMENT_TIMEZONE).
+
+If the tables ever drift (e.g. after editing appointments by hand), recompute
+them from scratch with `python -m utils.booking_stats`.
+"""
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SessionLocal
+from models import DbAppointment, DbDepartmentDailyBookings, DbDoctor, DbDoctorBookingStats
+from utils.appointment_utils import clinic_timezone
+
+UPSERT_INSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": postgresql_insert,
+}
+
+
+def booking_day(start: datetime) -> date:
+    """Clinic-local day of an appointment."""
+    return start.astimezone(clinic_timezone()).date()
+
+
+def increment(dialect: str, table, keys: dict, delta: int):
+    """Upsert statement adding `delta` to `table.bookings` for the row identified by `keys`."""
+    values = {**keys, "bookings": delta}
+    if dialect == "mysql":
+        return mysql_insert(table).values(**values).on_duplicate_key_update(
+            bookings=table.c.bookings + delta)
+    return UPSERT_INSERTS[dialect](table).values(**values).on_conflict_do_update(
+        index_elements=list(keys), set_={"bookings": table.c.bookings + delta})
+
+
+async def record_booking(db: AsyncSession, doctor_id: int, start: datetime, delta: int = 1) -> None:
+    """
+    Count a booking (`delta=1`) or a cancellation (`delta=-1`) in the caller's transaction.
+
+    Args:
+        db (AsyncSession): Session holding the booking or cancellation; not committed here
+        doctor_id (int): Doctor of the appointment
+        start (datetime): Start of the appointment
+        delta (int): Change in the number of bookings
+    """
+    # Usually already in the identity map from the availability check
+    doctor = await db.get(DbDoctor, doctor_id)
+    dialect = db.bind.dialect.name
+    await db.execute(increment(
+        dialect, DbDoctorBookingStats.__table__, {"doctor_id": doctor_id}, delta))
+    await db.execute(increment(
+        dialect, DbDepartmentDailyBookings.__table__,
+        {"speciality_id": doctor.speciality_id, "day": booking_day(start)}, delta))
+
+
+def rebuild_booking_stats(db) -> dict:
+    """
+    Recompute both statistics tables from `appointments`.
+
+    Appointments are streamed and counted in memory, which is bounded by the
+    number of doctors and department-days rather than appointments.
+
+    Args:
+        db: Session or Connection; the caller commits
+
+    Returns:
+        dict: Number of appointments counted and rows written per table
+    """
+    doctors, departments = Counter(), Counter()
+    appointments = 0
+    rows = db.execute(
+        select(DbAppointment.doctor_id, DbDoctor.speciality_id, DbAppointment.start)
+        .join(DbDoctor, DbDoctor.id == DbAppointment.doctor_id)
+        .execution_options(yield_per=1000)
+    )
+    for doctor_id, speciality_id, start in rows:
+        doctors[doctor_id] += 1
+        departments[speciality_id, booking_day(start)] += 1
+        appointments += 1
+
+    db.execute(delete(DbDoctorBookingStats))
+    db.execute(delete(DbDepartmentDailyBookings))
+    if doctors:
+        db.execute(insert(DbDoctorBookingStats), [
+            {"doctor_id": doctor_id, "bookings": count} for doctor_id, count in doctors.items()
+        ])
+    if departments:
+        db.execute(insert(DbDepartmentDailyBookings), [
+            {"speciality_id": speciality_id, "day": day, "bookings": count}
+            for (speciality_id, day), count in departments.items()
+        ])
+    return {"appointments": appointments, "doctors": len(doctors), "department_days": len(departments)}
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        counts = rebuild_booking_stats(db)
+        db.commit()
+        print(f"Counted {counts['appointments']} appointments into {counts['doctors']} doctor "
+              f"and {counts['department_days']} department-day rows.")
+    finally:
+        db.close()
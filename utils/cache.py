@@ -0,0 +1,144 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+from config import settings
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries also expire after a TTL.
+
+    Args:
+        maxsize (int): Maximum number of entries kept before evicting the least recently used
+        ttl (float): Entry lifetime in seconds
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> Any:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+class CatalogCache:
+    """
+    Read-through cache of serialized doctor catalog responses.
+
+    Entries are keyed by the catalog version, so `invalidate` makes every
+    previously cached response unreachable at once.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = 0
+        self.invalidations = 0
+
+    async def get_or_render(
+        self,
+        key: Hashable,
+        render: Callable[[], Awaitable[Union[bytes, Tuple[bytes, Dict[str, str]]]]]
+    ) -> CachedResponse:
+        """
+        Return the cached response for `key`, rendering and storing it on a miss.
+
+        `render` returns the serialized body, optionally with extra response
+        headers (such as a pagination cursor) to cache alongside it.
+
+        The ETag is a digest of the serialized body, so it stays stable across
+        TTL refreshes and across workers serving the same catalog.
+        """
+        cache_key = (self.version, key)
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            rendered = await render()
+            body, headers = rendered if isinstance(
+                rendered, tuple) else (rendered, {})
+            digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+            entry = self._cache.set(cache_key, CachedResponse(
+                body=body, etag=f'"{digest}"', headers=tuple(headers.items())))
+        return entry
+
+    def invalidate(self) -> None:
+        """Drop all cached responses after the catalog changes."""
+        self.version += 1
+        self.invalidations += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "version": self.version,
+            "invalidations": self.invalidations,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an `If-None-Match` header value against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.CATALOG_CACHE_MAXSIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,62 @@
+"""
+bcrypt cost calibration.
+
+Times password hashing on this host for increasing cost factors and
+recommends the highest `BCRYPT_ROUNDS` within a target latency:
+
+    python -m utils.calibrate_bcrypt [--target-ms 250]
+"""
+import argparse
+import time
+from typing import List, Tuple
+from passlib.hash import bcrypt
+from config import settings
+
+
+def calibrate_rounds(target_ms: float, max_rounds: int = 16) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Measure bcrypt hash time on this host for increasing cost factors.
+
+    Stops at the first cost factor slower than twice the target, so the
+    measurement takes a few multiples of the target at most.
+
+    Args:
+        target_ms (float): Acceptable time for one hash (and one login)
+        max_rounds (int): Highest cost factor to try
+
+    Returns:
+        Tuple[int, List[Tuple[int, float]]]: Highest cost factor within the
+        target (at least bcrypt's minimum of 4), and the (rounds, milliseconds)
+        measurements
+    """
+    recommended = 4
+    timings = []
+    for rounds in range(4, max_rounds + 1):
+        handler = bcrypt.using(rounds=rounds)
+        samples = []
+        for _ in range(3 if rounds < 10 else 1):
+            start = time.perf_counter()
+            handler.hash("calibration password")
+            samples.append((time.perf_counter() - start) * 1000)
+        elapsed = min(samples)
+        timings.append((rounds, elapsed))
+        if elapsed <= target_ms:
+            recommended = rounds
+        if elapsed > 2 * target_ms:
+            break
+    return recommended, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommend BCRYPT_ROUNDS for a target hash time on this host.")
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="Acceptable time for one password hash")
+    args = parser.parse_args()
+
+    recommended, timings = calibrate_rounds(args.target_ms)
+    for rounds, elapsed in timings:
+        marker = "  <- recommended" if rounds == recommended else ""
+        print(f"rounds {rounds:2d}: {elapsed:8.1f} ms{marker}")
+    print(f"BCRYPT_ROUNDS={recommended} (currently {settings.BCRYPT_ROUNDS}); "
+          f"each login costs about one hash and uses one of the "
+          f"{settings.PASSWORD_HASH_WORKERS} PASSWORD_HASH_WORKERS threads.")
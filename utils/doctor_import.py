@@ -0,0 +1,206 @@
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import DbDoctor
+from schemas.doctor import DoctorCreate
+from utils.doctor_utils import get_or_create_speciality, parse_experience_years, speciality_key
+
+# Rows inserted per executemany batch / transaction
+BULK_INSERT_BATCH_SIZE = 500
+
+# Upper bound on per-row errors kept in a report
+MAX_REPORTED_ERRORS = 1000
+
+# Flat CSV columns mapped onto the nested DoctorCreate fields
+CSV_NESTED_COLUMNS = {
+    "address_line1": ("address", "line1"),
+    "address_line2": ("address", "line2"),
+    "speciality_title": ("speciality", "title"),
+    "speciality_icon": ("speciality", "icon"),
+}
+
+
+class DoctorImporter:
+    """
+    Validate doctor records one by one and insert them in batched transactions.
+
+    Each batch is inserted with a single executemany-style INSERT and committed
+    on its own, so a failing batch only rolls back its own rows. Validation is
+    pure CPU work; only `flush` needs a (synchronous) session, which async
+    callers provide through `AsyncSession.run_sync`.
+
+    Args:
+        batch_size (int): Number of valid rows inserted per transaction
+    """
+
+    def __init__(self, batch_size: int = BULK_INSERT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self._batch: List[Tuple[int, DoctorCreate]] = []
+        self._speciality_ids: Dict[str, int] = {}
+
+    def add(self, row: int, record: dict) -> bool:
+        """
+        Validate a record and queue it.
+
+        Returns:
+            bool: True when the batch is full and should be flushed
+        """
+        try:
+            doctor = DoctorCreate.model_validate(record)
+        except ValidationError as e:
+            self._record_error(row, [
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ])
+            return False
+
+        self._batch.append((row, doctor))
+        return len(self._batch) >= self.batch_size
+
+    def add_error(self, row: int, message: str) -> None:
+        """Record a row that could not be parsed."""
+        self._record_error(row, [message])
+
+    def flush(self, db: Session) -> None:
+        """Insert and commit the queued batch."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        try:
+            db.execute(insert(DbDoctor), [
+                self._doctor_values(db, doctor) for _, doctor in batch
+            ])
+            db.commit()
+            self.inserted += len(batch)
+        except Exception as e:
+            db.rollback()
+            # Specialities created in the rolled back transaction are gone too
+            self._speciality_ids.clear()
+            for row, _ in batch:
+                self._record_error(row, [f"Failed to insert: {str(e)}"])
+
+    def report(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _doctor_values(self, db: Session, doctor: DoctorCreate) -> dict:
+        return {
+            "name": doctor.name,
+            "about": doctor.about,
+            "address": doctor.address.model_dump(),
+            "degree": doctor.degree,
+            "experience": doctor.experience,
+            "experience_years": parse_experience_years(doctor.experience),
+            "fees": doctor.fees,
+            "image": doctor.image,
+            "speciality_id": self._speciality_id(db, doctor),
+            "available": doctor.available,
+        }
+
+    def _speciality_id(self, db: Session, doctor: DoctorCreate) -> int:
+        key = speciality_key(doctor.speciality.title)
+        if key not in self._speciality_ids:
+            self._speciality_ids[key] = get_or_create_speciality(
+                db, doctor.speciality.title, doctor.speciality.icon).id
+        return self._speciality_ids[key]
+
+    def _record_error(self, row: int, errors: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into decoded lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+def parse_ndjson_record(line: str) -> dict:
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    return record
+
+
+def parse_csv_record(header: List[str], text: str) -> dict:
+    """Parse one CSV record and nest the flat address/speciality columns."""
+    values = next(csv.reader([text]))
+    if len(values) != len(header):
+        raise ValueError(
+            f"Expected {len(header)} columns, got {len(values)}")
+
+    record: dict = {}
+    for column, value in zip(header, values):
+        if value == "":
+            continue
+        if column in CSV_NESTED_COLUMNS:
+            parent, child = CSV_NESTED_COLUMNS[column]
+            record.setdefault(parent, {})[child] = value
+        else:
+            record[column] = value
+    return record
+
+
+async def import_doctor_stream(db: AsyncSession, lines: AsyncIterator[str], fmt: str) -> dict:
+    """
+    Import doctors from NDJSON or CSV lines, flushing full batches as they fill up.
+
+    Row numbers in the report are 1-based data rows (the CSV header is not counted).
+    CSV records with quoted fields spanning several lines are supported.
+    """
+    importer = DoctorImporter()
+    header: Optional[List[str]] = None
+    pending = ""
+    row = 0
+
+    async for line in lines:
+        if fmt == "csv":
+            # An odd number of quotes means a quoted field continues on the next line
+            pending = f"{pending}\n{line}" if pending else line
+            if pending.count('"') % 2:
+                continue
+            text, pending = pending, ""
+        else:
+            text = line
+
+        if not text.strip():
+            continue
+
+        if fmt == "csv" and header is None:
+            header = [column.strip() for column in next(csv.reader([text]))]
+            continue
+
+        row += 1
+        try:
+            record = parse_csv_record(
+                header, text) if fmt == "csv" else parse_ndjson_record(text)
+        except (ValueError, csv.Error) as e:
+            importer.add_error(row, f"Could not parse row: {str(e)}")
+            continue
+        if importer.add(row, record):
+            await db.run_sync(importer.flush)
+
+    if pending:
+        importer.add_error(row + 1, "Could not parse row: unterminated quote")
+
+    await db.run_sync(importer.flush)
+    return importer.report()
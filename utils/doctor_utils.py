@@ -0,0 +1,65 @@
+import re
+from typing import Optional
+from sqlalchemy.orm import Session
+from models import DbSpeciality
+
+
+def speciality_key(title: str) -> str:
+    """Return the case-folded lookup key for a speciality title."""
+    return title.strip().casefold()
+
+
+EXPERIENCE_PART = re.compile(
+    r"(\d+(?:\.\d+)?)\s*\+?\s*(?:(years?|yrs?)|(months?|mos?))\b", re.IGNORECASE)
+EXPERIENCE_SEPARATORS = re.compile(r"[\s,+]|\band\b", re.IGNORECASE)
+
+
+def parse_experience_years(experience: str) -> Optional[int]:
+    """
+    Convert free-form experience like "4 Years", "18 Months" or "2 years 6 months"
+    to whole years.
+
+    Returns None if the text has no number with a year or month unit, or has
+    anything else besides, so values that cannot be interpreted are left out
+    of experience filters instead of being misread.
+    """
+    parts = list(EXPERIENCE_PART.finditer(experience or ""))
+    if not parts or EXPERIENCE_SEPARATORS.sub("", EXPERIENCE_PART.sub("", experience)):
+        return None
+    months = sum(float(part.group(1)) * (12 if part.group(2) else 1) for part in parts)
+    return int(months // 12)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Build a safe FTS5 MATCH expression from user input.
+
+    Every word is quoted (so FTS operators in the input are treated as text)
+    and prefix-matched; all words must match.
+    """
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def get_or_create_speciality(db: Session, title: str, icon: str) -> DbSpeciality:
+    """
+    Get the speciality matching the title, creating it if needed.
+
+    Args:
+        db (Session): Database session
+        title (str): Speciality title
+        icon (str): Icon used when a new speciality is created
+
+    Returns:
+        DbSpeciality: Existing or newly flushed speciality
+    """
+    key = speciality_key(title)
+    speciality = db.query(DbSpeciality).filter(
+        DbSpeciality.key == key).first()
+    if speciality is None:
+        speciality = DbSpeciality(title=title, icon=icon, key=key)
+        db.add(speciality)
+        db.flush()
+    return speciality
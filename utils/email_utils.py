@@ -1,68 +1,173 @@
 import smtplib
 import random
 import string
+from datetime import datetime, timezone
 from pathlib import Path
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Dict, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from config import settings
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+from models import DbEmailOutbox
 
-# Setup Jinja2 environment
 template_dir = Path(__file__).parent.parent / "templates"
-env = Environment(loader=FileSystemLoader(str(template_dir)))
 
+# Emails rendered by the application; each has an .html and a .txt template
+EMAIL_TEMPLATES = ("email_verification", "appointment_confirmation", "appointment_reminder")
 
-def generate_otp() -> str:
-    """Generate a 6-digit OTP code."""
-    return ''.join(random.choices(string.digits, k=6))
 
+def create_template_environment(bytecode_cache_dir: Optional[str] = None) -> Environment:
+    """
+    Jinja2 environment for email templates.
 
-def send_verification_email(email: str, otp: str) -> bool:
+    Templates are compiled once and never re-checked on disk (restart to pick
+    up edits). With `bytecode_cache_dir`, compiled templates are also cached
+    on disk so new worker processes skip the Jinja2 compile step.
     """
-    Send a verification email with OTP using HTML template.
+    return Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(
+            bytecode_cache_dir) if bytecode_cache_dir else None
+    )
+
+
+_environment: Optional[Environment] = None
+compiled_templates: Dict[str, Template] = {}
+
+
+def template_environment() -> Environment:
+    """The application's template environment, created on first use."""
+    global _environment
+    if _environment is None:
+        _environment = create_template_environment(settings.EMAIL_TEMPLATE_BYTECODE_CACHE_DIR)
+    return _environment
+
+
+def get_email_template(filename: str) -> Template:
+    """Compiled template `filename`, compiling it on first use."""
+    template = compiled_templates.get(filename)
+    if template is None:
+        template = compiled_templates[filename] = template_environment().get_template(filename)
+    return template
+
+
+def load_email_templates() -> None:
+    """Compile all email templates up front, e.g. at application startup."""
+    for name in EMAIL_TEMPLATES:
+        for extension in ("html", "txt"):
+            get_email_template(f"{name}.{extension}")
+
+
+def render_email(name: str, **context) -> Tuple[str, str]:
+    """
+    Render the HTML and plain-text variants of an email template.
 
     Args:
-        email (str): Recipient's email address
-        otp (str): OTP code to be sent
+        name (str): Template name without extension, one of EMAIL_TEMPLATES
 
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        Tuple[str, str]: HTML and text content
     """
-    try:
-        # Get the email template
-        template = env.get_template("email_verification.html")
-
-        # Render the template with the OTP
-        html_content = template.render(otp_code=otp)
+    return (get_email_template(f"{name}.html").render(**context),
+            get_email_template(f"{name}.txt").render(**context))
 
-        # Create the email message
-        msg = MIMEMultipart("alternative")
-        msg["From"] = settings.SMTP_USERNAME
-        msg["To"] = email
-        msg["Subject"] = "Verify Your Email - Health Connect"
 
-        # Attach HTML content
-        msg.attach(MIMEText(html_content, "html"))
+def generate_otp() -> str:
+    """Generate a 6-digit OTP code."""
+    return ''.join(random.choices(string.digits, k=6))
 
-        # Connect to SMTP server and send email
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
 
-        return True
+def queue_email(
+    db: AsyncSession,
+    recipient: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> DbEmailOutbox:
+    """
+    Add an email to the outbox in the caller's transaction.
 
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        return False
+    Nothing is sent until the transaction commits; the outbox worker
+    (utils/outbox.py) then delivers it with retries.
+    """
+    message = DbEmailOutbox(**outbox_values(
+        recipient, subject, html_content, text_content, datetime.now(timezone.utc)))
+    db.add(message)
+    return message
+
+
+def outbox_values(
+    recipient: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str],
+    now: datetime
+) -> dict:
+    """Column values of a new pending outbox message, e.g. for a bulk INSERT."""
+    return {
+        "recipient": recipient,
+        "subject": subject,
+        "html_body": html_content,
+        "text_body": text_content,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+
+def appointment_email_context(
+    user_name: str,
+    doctor_name: str,
+    date_time: str,
+    doctor_details: dict
+) -> dict:
+    """Template variables shared by the appointment emails."""
+    # Extract day and time from date_time string (format: "Tue 18 | 13:00")
+    day_date, time = date_time.split(" | ")
+    return {
+        "user_name": user_name,
+        "doctor_name": doctor_name,
+        "doctor_speciality": doctor_details["speciality"],
+        "day_date": day_date,
+        "time": time,
+        "address": doctor_details["address"],
+    }
+
+
+def queue_verification_email(db: AsyncSession, email: str, otp: str) -> DbEmailOutbox:
+    """
+    Queue a verification email with OTP.
 
+    Args:
+        db (AsyncSession): Session whose transaction the email joins
+        email (str): Recipient's email address
+        otp (str): OTP code to be sent
 
-def send_appointment_confirmation(user_email: str, user_name: str, doctor_name: str, date_time: str, doctor_details: dict) -> bool:
-    
+    Returns:
+        DbEmailOutbox: The queued outbox message
+    """
+    html_content, text_content = render_email(
+        "email_verification", otp_code=otp)
+    return queue_email(db, email, "Verify Your Email - Health Connect", html_content, text_content)
+
+
+def queue_appointment_confirmation(
+    db: AsyncSession,
+    user_email: str,
+    user_name: str,
+    doctor_name: str,
+    date_time: str,
+    doctor_details: dict
+) -> DbEmailOutbox:
     """
-    Send an appointment confirmation email using HTML template.
+    Queue an appointment confirmation email.
 
     Args:
+        db (AsyncSession): Session whose transaction the email joins
         user_email (str): Recipient's email address
         user_name (str): Name of the user
         doctor_name (str): Name of the doctor
@@ -70,44 +175,53 @@ def send_appointment_confirmation(user_email: str, user_name: str, doctor_name:
         doctor_details (dict): Dictionary containing doctor's details
 
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        DbEmailOutbox: The queued outbox message
     """
+    html_content, text_content = render_email(
+        "appointment_confirmation",
+        **appointment_email_context(user_name, doctor_name, date_time, doctor_details))
+    return queue_email(db, user_email, "Your Appointment Confirmation - Health Connect",
+                       html_content, text_content)
+
+
+def build_message(
+    recipient: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["From"] = settings.SMTP_USERNAME
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    # Alternatives go from plainest to richest; clients show the last they support
+    if text_content:
+        msg.attach(MIMEText(text_content, "plain"))
+    msg.attach(MIMEText(html_content, "html"))
+    return msg
+
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """
+    Open an authenticated SMTP connection to the configured server.
+
+    STARTTLS and login are skipped when `SMTP_STARTTLS` is false or
+    `SMTP_PASSWORD` is empty, which is what a local SMTP sink needs.
+
+    Raises:
+        RuntimeError: If `SMTP_USERNAME` (the sender address) is not configured;
+            the outbox keeps the messages and retries them later
+    """
+    if not settings.SMTP_USERNAME:
+        raise RuntimeError("SMTP_USERNAME is not configured")
+    server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT,
+                          timeout=settings.SMTP_TIMEOUT_SECONDS)
     try:
-        # Get the email template
-        template = env.get_template("appointment_confirmation.html")
-
-        # Extract day and time from date_time string (format: "Tue 18 | 13:00")
-        day_date, time = date_time.split(" | ")
-
-        # Render the template with appointment details
-        print(doctor_details,"doctor details")
-        html_content = template.render(
-            user_name=user_name,
-            doctor_name=doctor_name,
-            doctor_speciality=doctor_details["speciality"],
-            day_date=day_date,
-            time=time,
-            address=doctor_details["address"]
-        )
-        print(html_content,"html content")
-
-        # Create the email message
-        msg = MIMEMultipart("alternative")
-        msg["From"] = settings.SMTP_USERNAME
-        msg["To"] = user_email
-        msg["Subject"] = "Your Appointment Confirmation - Health Connect"
-
-        # Attach HTML content
-        msg.attach(MIMEText(html_content, "html"))
-
-        # Connect to SMTP server and send email
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
+        if settings.SMTP_STARTTLS:
             server.starttls()
+        if settings.SMTP_PASSWORD:
             server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-
-        return True
-
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        return False
+    except Exception:
+        server.close()
+        raise
+    return server
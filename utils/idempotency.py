@@ -0,0 +1,173 @@
+"""
+Idempotency keys for unsafe requests.
+
+A client sends an `Idempotency-Key` header with a request it may retry. The
+first request claims the key, does the work and stores its response; retries
+within `IDEMPOTENCY_KEY_TTL_SECONDS` are answered from the stored response
+with a single lookup on the unique (user_id, key) index.
+
+A claim that has not finished within `IDEMPOTENCY_KEY_LEASE_SECONDS` (its
+worker crashed or lost the database) lapses, so retries are not refused as
+"in progress" until the key expires.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import DbIdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """The key was already used for a different request."""
+
+
+class IdempotencyKeyInProgressError(Exception):
+    """The first request with this key has not finished yet."""
+
+
+def request_hash(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def claim_lapsed(record: DbIdempotencyKey, now: datetime) -> bool:
+    """Whether `record` is an unfinished claim older than its lease."""
+    lease = timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE_SECONDS)
+    return record.status_code is None and (
+        record.claimed_at is None or record.claimed_at <= now - lease)
+
+
+def stored_response(record: DbIdempotencyKey, fingerprint: str) -> Response:
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyMismatchError(
+            "Idempotency-Key was already used for a different request")
+    if record.status_code is None:
+        raise IdempotencyKeyInProgressError(
+            "A request with this Idempotency-Key is still being processed")
+    return Response(
+        content=record.response_body,
+        status_code=record.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+
+async def claim_idempotency_key(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    fingerprint: str
+) -> Optional[Response]:
+    """
+    Claim `key` for a new request, or return the response stored for it.
+
+    Args:
+        db (AsyncSession): Database session
+        user_id (int): Keys are scoped per user
+        key (str): Client-supplied Idempotency-Key
+        fingerprint (str): `request_hash` of the request body
+
+    Returns:
+        Optional[Response]: The stored response to replay, or None if the
+        caller now owns the key and must complete (and commit) or release it
+
+    Raises:
+        IdempotencyKeyMismatchError: If the key belongs to a different request
+        IdempotencyKeyInProgressError: If the first request is still running
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    query = select(DbIdempotencyKey).where(
+        DbIdempotencyKey.user_id == user_id, DbIdempotencyKey.key == key)
+
+    record = await db.scalar(query)
+    if record is not None and record.expires_at > now and not claim_lapsed(record, now):
+        return stored_response(record, fingerprint)
+
+    if record is not None:
+        # Expired keys and lapsed claims are taken over in place rather than
+        # deleted and re-inserted. Only if nobody else took the row over since
+        # it was read, so of several concurrent retries exactly one wins.
+        claimed_at = DbIdempotencyKey.claimed_at
+        result = await db.execute(
+            update(DbIdempotencyKey)
+            .where(DbIdempotencyKey.id == record.id,
+                   DbIdempotencyKey.request_hash == record.request_hash,
+                   DbIdempotencyKey.expires_at == record.expires_at,
+                   claimed_at.is_(None) if record.claimed_at is None
+                   else claimed_at == record.claimed_at)
+            .values(request_hash=fingerprint, status_code=None, response_body=None,
+                    expires_at=expires_at, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.rowcount == 1
+    else:
+        db.add(DbIdempotencyKey(user_id=user_id, key=key, request_hash=fingerprint,
+                                expires_at=expires_at, claimed_at=now))
+        claimed = True
+    if claimed:
+        try:
+            await db.commit()
+            return None
+        except IntegrityError:
+            pass
+
+    # A concurrent request with the same key claimed it first
+    await db.rollback()
+    record = await db.scalar(query)
+    if record is None:
+        raise IdempotencyKeyInProgressError(
+            "A request with this Idempotency-Key is still being processed")
+    return stored_response(record, fingerprint)
+
+
+async def complete_idempotency_key(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    status_code: int,
+    body: str
+) -> None:
+    """Store the final response of a claimed key in the caller's transaction."""
+    await db.execute(
+        update(DbIdempotencyKey)
+        .where(DbIdempotencyKey.user_id == user_id, DbIdempotencyKey.key == key,
+               DbIdempotencyKey.status_code.is_(None))
+        .values(status_code=status_code, response_body=body)
+    )
+
+
+async def release_idempotency_key(db: AsyncSession, user_id: int, key: str) -> None:
+    """Give up a claimed key after a failed request so the client can retry it."""
+    await db.execute(
+        delete(DbIdempotencyKey)
+        .where(DbIdempotencyKey.user_id == user_id, DbIdempotencyKey.key == key,
+               DbIdempotencyKey.status_code.is_(None))
+    )
+    await db.commit()
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """Delete expired keys; returns the number of rows removed."""
+    result = db.execute(
+        delete(DbIdempotencyKey)
+        .where(DbIdempotencyKey.expires_at <= datetime.now(timezone.utc))
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Purged {purge_expired_idempotency_keys(db)} expired idempotency keys.")
+    finally:
+        db.close()
@@ -0,0 +1,298 @@
+"""
+Lightweight, idempotent schema migrations.
+
+`Base.metadata.create_all` only creates missing tables; it never alters
+existing ones. Each migration below inspects the live schema and upgrades
+databases created by older versions of the application in place.
+"""
+import json
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import bindparam, delete, insert, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from database import Base, engine
+from models import DbAppointment, DbQuarantinedAppointment
+from models.types import UTCDateTime
+from utils.appointment_utils import default_end, parse_legacy_date_time
+from utils.booking_stats import rebuild_booking_stats
+from utils.doctor_utils import parse_experience_years, speciality_key
+
+
+def _columns(conn: Connection, table: str) -> set:
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _quarantine_appointments(conn: Connection, rows: List[dict], reason: str) -> None:
+    """
+    Move appointments out of `appointments` into `quarantined_appointments`.
+
+    Args:
+        rows (List[dict]): Appointments with id, user_id, doctor_id and
+            optionally date_time, start and end
+        reason (str): Why the rows could not be kept
+    """
+    if not rows:
+        return
+    now = datetime.now(timezone.utc)
+    conn.execute(insert(DbQuarantinedAppointment), [
+        {
+            "appointment_id": row["id"],
+            "user_id": row["user_id"],
+            "doctor_id": row["doctor_id"],
+            "date_time": row.get("date_time"),
+            "start": row.get("start"),
+            "end": row.get("end"),
+            "reason": reason,
+            "quarantined_at": now,
+        }
+        for row in rows
+    ])
+    conn.execute(delete(DbAppointment.__table__).where(
+        DbAppointment.__table__.c.id.in_([row["id"] for row in rows])))
+    print(f"Moved {len(rows)} appointments to quarantined_appointments ({reason}): "
+          f"{[row['id'] for row in rows]}")
+
+
+def migrate_doctor_specialities(conn: Connection) -> None:
+    """Move the legacy JSON `doctors.speciality` column into `specialities`."""
+    columns = _columns(conn, "doctors")
+    if not columns:
+        return
+
+    if "speciality_id" not in columns:
+        conn.execute(text(
+            "ALTER TABLE doctors ADD COLUMN speciality_id INTEGER "
+            "REFERENCES specialities(id)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_doctors_speciality_id "
+            "ON doctors (speciality_id)"))
+
+    if "speciality" not in columns:
+        return
+
+    speciality_ids = {
+        key: speciality_id for speciality_id, key in conn.execute(
+            text("SELECT id, key FROM specialities"))
+    }
+    rows = conn.execute(
+        text("SELECT id, speciality FROM doctors WHERE speciality_id IS NULL")).all()
+    for doctor_id, raw in rows:
+        speciality = json.loads(raw) if isinstance(raw, str) else raw
+        key = speciality_key(speciality["title"])
+        if key not in speciality_ids:
+            speciality_ids[key] = conn.execute(
+                text("INSERT INTO specialities (title, icon, key) "
+                     "VALUES (:title, :icon, :key) RETURNING id"),
+                {"title": speciality["title"],
+                    "icon": speciality["icon"], "key": key}
+            ).scalar_one()
+        conn.execute(
+            text("UPDATE doctors SET speciality_id = :speciality_id WHERE id = :id"),
+            {"speciality_id": speciality_ids[key], "id": doctor_id}
+        )
+
+    conn.execute(text("ALTER TABLE doctors DROP COLUMN speciality"))
+    print(f"Migrated specialities for {len(rows)} doctors.")
+
+
+def migrate_doctor_search_columns(conn: Connection) -> None:
+    """Add and backfill the indexed columns used by doctor search filters."""
+    columns = _columns(conn, "doctors")
+    if not columns:
+        return
+
+    if "experience_years" not in columns:
+        conn.execute(text(
+            "ALTER TABLE doctors ADD COLUMN experience_years INTEGER"))
+        rows = conn.execute(
+            text("SELECT id, experience FROM doctors")).all()
+        if rows:
+            conn.execute(
+                text("UPDATE doctors SET experience_years = :years WHERE id = :id"),
+                [{"years": parse_experience_years(experience), "id": doctor_id}
+                 for doctor_id, experience in rows]
+            )
+
+    for column in ("fees", "available", "experience_years"):
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_doctors_{column} ON doctors ({column})"))
+
+
+def migrate_doctor_fts(conn: Connection) -> None:
+    """Create the SQLite FTS5 index over doctor names and descriptions."""
+    if conn.dialect.name != "sqlite" or not _columns(conn, "doctors"):
+        return
+    if inspect(conn).has_table("doctors_fts"):
+        return
+
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE doctors_fts USING fts5("
+        "name, about, content='doctors', content_rowid='id')"))
+    # Keep the external-content index in sync with the doctors table
+    conn.execute(text(
+        "CREATE TRIGGER doctors_fts_ai AFTER INSERT ON doctors BEGIN "
+        "INSERT INTO doctors_fts (rowid, name, about) "
+        "VALUES (new.id, new.name, new.about); END"))
+    conn.execute(text(
+        "CREATE TRIGGER doctors_fts_ad AFTER DELETE ON doctors BEGIN "
+        "INSERT INTO doctors_fts (doctors_fts, rowid, name, about) "
+        "VALUES ('delete', old.id, old.name, old.about); END"))
+    conn.execute(text(
+        "CREATE TRIGGER doctors_fts_au AFTER UPDATE OF name, about ON doctors BEGIN "
+        "INSERT INTO doctors_fts (doctors_fts, rowid, name, about) "
+        "VALUES ('delete', old.id, old.name, old.about); "
+        "INSERT INTO doctors_fts (rowid, name, about) "
+        "VALUES (new.id, new.name, new.about); END"))
+    conn.execute(text(
+        "INSERT INTO doctors_fts (doctors_fts) VALUES ('rebuild')"))
+
+
+def migrate_user_staff_flag(conn: Connection) -> None:
+    """Add the staff flag to users; existing users are not staff."""
+    columns = _columns(conn, "users")
+    if columns and "is_staff" not in columns:
+        conn.execute(text(
+            "ALTER TABLE users ADD COLUMN is_staff BOOLEAN NOT NULL DEFAULT FALSE"))
+
+
+def migrate_appointment_times(conn: Connection) -> None:
+    """
+    Replace the free-form `appointments.date_time` string with UTC start/end columns.
+
+    Legacy strings such as "Tue 18 | 13:00" carry no month or year; they are
+    resolved to the closest matching date around the time of the migration.
+    Rows that cannot be parsed are moved to `quarantined_appointments`, so
+    start and end are never NULL.
+    """
+    columns = _columns(conn, "appointments")
+    if not columns:
+        return
+
+    if "start" not in columns:
+        conn.execute(text("ALTER TABLE appointments ADD COLUMN start DATETIME"))
+        conn.execute(text('ALTER TABLE appointments ADD COLUMN "end" DATETIME'))
+
+    if "date_time" in columns:
+        now = datetime.now(timezone.utc)
+        rows = conn.execute(text(
+            "SELECT id, user_id, doctor_id, date_time FROM appointments "
+            "WHERE start IS NULL")).mappings().all()
+        update = text(
+            'UPDATE appointments SET start = :start, "end" = :end WHERE id = :id'
+        ).bindparams(bindparam("start", type_=UTCDateTime()), bindparam("end", type_=UTCDateTime()))
+
+        values, unparsed = [], []
+        for row in rows:
+            try:
+                start = parse_legacy_date_time(row["date_time"], now)
+            except ValueError:
+                unparsed.append(row)
+                continue
+            values.append(
+                {"id": row["id"], "start": start, "end": default_end(start)})
+        if values:
+            conn.execute(update, values)
+        _quarantine_appointments(conn, unparsed, "unparseable date_time")
+
+        conn.execute(text("ALTER TABLE appointments DROP COLUMN date_time"))
+        print(f"Migrated times for {len(values)} appointments.")
+
+    # The (user_id, start) index supersedes the single-column user index
+    conn.execute(text("DROP INDEX IF EXISTS ix_appointments_user_id"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_doctor_id_start ON appointments (doctor_id, start)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_user_id_start ON appointments (user_id, start)"))
+
+
+def migrate_appointment_slot_uniqueness(conn: Connection) -> None:
+    """
+    Make the (doctor_id, start) index unique so a slot can only be booked once.
+
+    Earlier versions allowed double bookings. Of each doubly booked slot the
+    earliest booking (lowest id) is kept; the others are moved to
+    `quarantined_appointments`.
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table("appointments"):
+        return
+    indexes = {index["name"]: index for index in inspector.get_indexes("appointments")}
+    index = indexes.get("ix_appointments_doctor_id_start")
+    if index and index["unique"]:
+        return
+
+    duplicates = conn.execute(text(
+        'SELECT a.id, a.user_id, a.doctor_id, a.start, a."end" FROM appointments a '
+        "JOIN (SELECT doctor_id, start, MIN(id) AS kept_id FROM appointments "
+        "GROUP BY doctor_id, start HAVING COUNT(*) > 1) slot "
+        "ON a.doctor_id = slot.doctor_id AND a.start = slot.start AND a.id <> slot.kept_id "
+        "ORDER BY a.id"
+    ).columns(start=UTCDateTime(), end=UTCDateTime())).mappings().all()
+    _quarantine_appointments(conn, duplicates, "double booking")
+
+    conn.execute(text("DROP INDEX IF EXISTS ix_appointments_doctor_id_start"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX ix_appointments_doctor_id_start ON appointments (doctor_id, start)"))
+
+
+def migrate_email_outbox_text_body(conn: Connection) -> None:
+    """Add the plain-text alternative to queued emails."""
+    columns = _columns(conn, "email_outbox")
+    if columns and "text_body" not in columns:
+        conn.execute(text("ALTER TABLE email_outbox ADD COLUMN text_body TEXT"))
+
+
+def migrate_appointment_reminders(conn: Connection) -> None:
+    """Track sent reminders and index appointments by start time."""
+    columns = _columns(conn, "appointments")
+    if not columns:
+        return
+    if "reminder_sent_at" not in columns:
+        conn.execute(text(
+            "ALTER TABLE appointments ADD COLUMN reminder_sent_at DATETIME"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_start ON appointments (start)"))
+
+
+def migrate_booking_stats(conn: Connection) -> None:
+    """Backfill the booking statistics tables on databases that predate them."""
+    if conn.execute(text("SELECT 1 FROM doctor_booking_stats LIMIT 1")).first():
+        return
+    if conn.execute(text("SELECT 1 FROM appointments LIMIT 1")).first():
+        rebuild_booking_stats(conn)
+
+
+def migrate_idempotency_key_lease(conn: Connection) -> None:
+    """Record when idempotency keys were claimed; unfinished legacy claims count as lapsed."""
+    columns = _columns(conn, "idempotency_keys")
+    if columns and "claimed_at" not in columns:
+        conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN claimed_at DATETIME"))
+
+
+MIGRATIONS = [
+    migrate_doctor_specialities,
+    migrate_doctor_search_columns,
+    migrate_doctor_fts,
+    migrate_user_staff_flag,
+    migrate_appointment_times,
+    migrate_appointment_slot_uniqueness,
+    migrate_email_outbox_text_body,
+    migrate_appointment_reminders,
+    migrate_booking_stats,
+    migrate_idempotency_key_lease,
+]
+
+
+def run_migrations(bind: Engine = engine) -> None:
+    """Create missing tables and apply all pending migrations."""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,194 @@
+"""
+Background delivery of queued emails.
+
+Requests only add rows to `email_outbox` inside their own transaction. An
+`OutboxWorker` running in each API process (or `python -m utils.outbox` from
+cron) claims due messages, sends them over the persistent SMTP connection
+pool and reschedules failures with exponential backoff.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import DbEmailOutbox
+from utils.email_utils import build_message
+from utils.smtp_pool import smtp_pool
+
+# A claimed message is retried by another worker if not finished within this time
+CLAIM_LEASE_SECONDS = 300
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter after `attempts` failed deliveries."""
+    delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+                settings.EMAIL_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def claim_due_messages(db: Session, limit: int) -> list:
+    """
+    Claim up to `limit` due messages for this worker.
+
+    A claim bumps `attempts` and pushes `next_attempt_at` out by the lease,
+    guarded by the previously read `attempts`, so concurrent workers never
+    claim the same message twice.
+    """
+    now = datetime.now(timezone.utc)
+    due = db.execute(
+        select(DbEmailOutbox.id, DbEmailOutbox.attempts)
+        .where(DbEmailOutbox.status == "pending", DbEmailOutbox.next_attempt_at <= now)
+        .order_by(DbEmailOutbox.next_attempt_at)
+        .limit(limit)
+    ).all()
+
+    claimed = []
+    for message_id, attempts in due:
+        result = db.execute(
+            update(DbEmailOutbox)
+            .where(DbEmailOutbox.id == message_id, DbEmailOutbox.attempts == attempts,
+                   DbEmailOutbox.status == "pending")
+            .values(attempts=attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS))
+        )
+        if result.rowcount:
+            claimed.append(message_id)
+    db.commit()
+
+    if not claimed:
+        return []
+    return list(db.scalars(
+        select(DbEmailOutbox).where(DbEmailOutbox.id.in_(claimed))
+        .order_by(DbEmailOutbox.id)
+    ))
+
+
+def record_failure(message: DbEmailOutbox, error: Exception) -> str:
+    message.last_error = str(error)
+    if message.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        message.status = "failed"
+    else:
+        message.next_attempt_at = datetime.now(
+            timezone.utc) + retry_delay(message.attempts)
+    return message.status
+
+
+def deliver_due_emails(db: Session, limit: Optional[int] = None) -> dict:
+    """
+    Send one batch of due messages.
+
+    Returns:
+        dict: Number of messages sent, rescheduled and given up on
+    """
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    messages = claim_due_messages(db, limit or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not messages:
+        return counts
+
+    errors = smtp_pool.send_many([
+        build_message(message.recipient, message.subject,
+                      message.html_body, message.text_body)
+        for message in messages
+    ])
+    now = datetime.now(timezone.utc)
+    for message, error in zip(messages, errors):
+        if error is None:
+            message.status = "sent"
+            message.sent_at = now
+            message.last_error = None
+            counts["sent"] += 1
+        else:
+            counts["retried" if record_failure(
+                message, error) == "pending" else "failed"] += 1
+    db.commit()
+    return counts
+
+
+def drain_outbox() -> dict:
+    """Deliver due messages batch by batch until none are left."""
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    db = SessionLocal()
+    try:
+        while True:
+            counts = deliver_due_emails(db)
+            for key, value in counts.items():
+                totals[key] += value
+            if not any(counts.values()):
+                return totals
+    finally:
+        db.close()
+
+
+class OutboxWorker:
+    """
+    Poll the outbox and deliver due messages from a background task.
+
+    SMTP and the synchronous session run in a thread so the event loop
+    serving requests is never blocked. `notify` wakes the worker right after
+    a request queued a message instead of waiting for the next poll.
+    """
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.errors = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(smtp_pool.close)
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                counts = await asyncio.to_thread(drain_outbox)
+                self.sent += counts["sent"]
+                self.retried += counts["retried"]
+                self.failed += counts["failed"]
+            except Exception as e:
+                self.errors += 1
+                print(f"Email outbox delivery failed: {str(e)}")
+            await asyncio.to_thread(smtp_pool.prune_idle)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+outbox_worker = OutboxWorker(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    print(drain_outbox())
+    smtp_pool.close()
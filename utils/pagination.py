@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Page size bounds for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the `after` value for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` projection.
+
+    Args:
+        fields (Optional[str]): Raw query parameter value
+        allowed (Iterable[str]): Field names that may be requested, in response order
+
+    Returns:
+        Optional[List[str]]: Requested fields in response order, always including `id`,
+        or None when no projection was requested
+
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    if not fields or not fields.strip():
+        return None
+
+    allowed = list(allowed)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    requested.add("id")
+    return [field for field in allowed if field in requested]
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    id_column,
+    after: Optional[int],
+    limit: int,
+    scalars: bool = False
+) -> Tuple[list, Optional[int]]:
+    """
+    Fetch one page of `stmt` ordered by `id_column`, starting after the cursor.
+
+    Args:
+        db (AsyncSession): Database session
+        stmt (Select): Statement selecting rows that expose an `id` attribute
+        id_column: Indexed, unique column used as the keyset
+        after (Optional[int]): Last id of the previous page
+        limit (int): Maximum number of rows to return
+        scalars (bool): Return the first column of each row (e.g. ORM entities)
+
+    Returns:
+        Tuple[list, Optional[int]]: The rows and the cursor of the next page, if any
+    """
+    if after is not None:
+        stmt = stmt.where(id_column > after)
+
+    result = await db.execute(stmt.order_by(id_column).limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def encode_time_cursor(moment: datetime, row_id: int) -> str:
+    """Encode a `(timestamp, id)` keyset position as "<microseconds since epoch>:<id>"."""
+    return f"{(moment - EPOCH) // timedelta(microseconds=1)}:{row_id}"
+
+
+def decode_time_cursor(after: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode a cursor produced by `encode_time_cursor`.
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if after is None:
+        return None
+    try:
+        micros, row_id = after.split(":")
+        return EPOCH + timedelta(microseconds=int(micros)), int(row_id)
+    except (ValueError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
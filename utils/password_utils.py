@@ -1,6 +1,15 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
 from passlib.context import CryptContext
+from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with any other cost factor are flagged by `needs_update` and
+# re-hashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -9,3 +18,93 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and re-hash it if the stored hash uses another cost factor.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and the new
+        hash to store if it needs updating
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so `workers` threads hash in
+    parallel; further calls wait in the pool's queue. `stats()` reports how
+    deep that queue gets and how long calls wait in it.
+
+    Args:
+        workers (int): Maximum number of concurrent bcrypt operations
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    async def _run(self, func: Callable, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt")
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def task():
+            wait = time.perf_counter() - submitted
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self.active,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "avg_wait_ms": self.total_wait / self.completed * 1000 if self.completed else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS)
+
@@ -0,0 +1,238 @@
+"""
+Token-bucket rate limiting for the authentication endpoints.
+
+Every bucket holds up to `burst` tokens and refills at `per_minute` tokens a
+minute; a request takes one token or is rejected with `429 Too Many Requests`.
+Each endpoint checks two buckets before doing any work: one per client IP and
+one per account (username or email).
+
+`RATE_LIMIT_BACKEND` selects where buckets live:
+
+- "memory": per worker process, at most `RATE_LIMIT_MAX_KEYS` buckets (least
+  recently used buckets are dropped, i.e. refilled).
+- "sqlite": a SQLite file at `RATE_LIMIT_SQLITE_PATH` shared by every worker
+  on the host; each check is a single atomic UPSERT.
+
+Behind a reverse proxy (e.g. on Vercel) the socket peer is the proxy, so every
+client would share one IP bucket. Set `RATE_LIMIT_TRUSTED_PROXIES` to the
+number of proxies in front of the app to take the client IP from
+X-Forwarded-For instead (see `client_ip`).
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, status
+from config import settings
+from database import set_sqlite_pragmas
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    burst: float
+    per_minute: float
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+def refill(tokens: float, updated_at: float, now: float, limit: BucketLimit) -> float:
+    return min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+
+
+class RateLimiter(ABC):
+    """Interface of bucket stores; also counts decisions for /metrics."""
+
+    backend = ""
+
+    def __init__(self):
+        self.allowed = Counter()
+        self.rejected = Counter()
+
+    @abstractmethod
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        """
+        Take a token from the bucket `key`.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise seconds until a token is available
+        """
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "allowed": dict(self.allowed),
+            "rejected": dict(self.rejected),
+        }
+
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    Per-process buckets in an LRU-bounded dict.
+
+    Args:
+        max_keys (int): Most buckets kept; the least recently used are forgotten
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_keys: int):
+        super().__init__()
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (limit.burst, now))
+        tokens = refill(tokens, updated_at, now, limit)
+        allowed = tokens >= 1
+        self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / limit.per_second
+
+    def stats(self) -> dict:
+        return {**super().stats(), "buckets": len(self._buckets), "max_keys": self.max_keys}
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Buckets in a SQLite table shared by all worker processes on the host.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    backend = "sqlite"
+
+    # Every SET expression sees the old row, so `allowed` and `tokens` are
+    # computed from the same refilled value in one atomic statement
+    TAKE = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at, allowed)
+        VALUES (:key, :burst - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            allowed = min(:burst, tokens + (:now - updated_at) * :rate) >= 1,
+            tokens = min(:burst, tokens + (:now - updated_at) * :rate)
+                     - (min(:burst, tokens + (:now - updated_at) * :rate) >= 1),
+            updated_at = :now
+        RETURNING allowed, tokens
+    """
+    # Buckets untouched for this long are full again and can be dropped
+    PURGE_AFTER_SECONDS = 3600
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            set_sqlite_pragmas(connection, None)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, allowed INTEGER NOT NULL)")
+            self._connection = connection
+        return self._connection
+
+    def _take(self, key: str, limit: BucketLimit) -> float:
+        # Wall-clock time: buckets are shared between processes
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            allowed, tokens = connection.execute(self.TAKE, {
+                "key": key, "burst": limit.burst, "rate": limit.per_second, "now": now
+            }).fetchone()
+            self._takes += 1
+            if self._takes % self.PURGE_EVERY == 0:
+                connection.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+                                   (now - self.PURGE_AFTER_SECONDS,))
+        return 0.0 if allowed else (1 - tokens) / limit.per_second
+
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        return await asyncio.to_thread(self._take, key, limit)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_rate_limiter(backend: str) -> RateLimiter:
+    if backend == "memory":
+        return MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "sqlite":
+        return SQLiteRateLimiter(settings.RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+
+
+rate_limiter = create_rate_limiter(settings.RATE_LIMIT_BACKEND)
+
+IP_LIMIT = BucketLimit(settings.AUTH_RATE_LIMIT_IP_BURST, settings.AUTH_RATE_LIMIT_IP_PER_MINUTE)
+ACCOUNT_LIMIT = BucketLimit(settings.AUTH_RATE_LIMIT_ACCOUNT_BURST,
+                            settings.AUTH_RATE_LIMIT_ACCOUNT_PER_MINUTE)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Address of the client that sent `request`.
+
+    With `RATE_LIMIT_TRUSTED_PROXIES` = n, this is the n-th address from the
+    right of X-Forwarded-For. Each trusted proxy appends the address it
+    received the request from, so addresses a client puts in the header
+    itself are never used. Without that many entries, or with 0 trusted
+    proxies, the socket peer address is used.
+    """
+    hops = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if hops:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",") if address.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limit(request: Request, endpoint: str, account: str) -> None:
+    """
+    Take a token from the client IP's and the account's bucket for `endpoint`.
+
+    Args:
+        request (Request): Incoming request, for the client address
+        endpoint (str): Name of the endpoint; each has its own buckets
+        account (str): Username or email the request is about
+
+    Raises:
+        HTTPException: 429 with Retry-After if either bucket is empty
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    for kind, key, limit in (
+        ("ip", f"{endpoint}:ip:{client_ip(request)}", IP_LIMIT),
+        ("account", f"{endpoint}:account:{account.strip().lower()}", ACCOUNT_LIMIT),
+    ):
+        retry_after = await rate_limiter.take(key, limit)
+        if retry_after:
+            rate_limiter.rejected[f"{endpoint}:{kind}"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(max(1, round(retry_after)))}
+            )
+    rate_limiter.allowed[endpoint] += 1
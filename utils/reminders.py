@@ -0,0 +1,178 @@
+"""
+Appointment reminder job.
+
+Walks appointments starting within the next `REMINDER_HOURS_BEFORE` hours on
+the `ix_appointments_start` index in keyset-paginated batches. Each batch is
+claimed by setting `reminder_sent_at` and its reminder emails are bulk-inserted
+into the outbox in the same transaction, so a run holds at most one batch in
+memory, can be interrupted at any point and never reminds anyone twice.
+
+Run it from cron (`python -m utils.reminders`) or let each API worker run it
+every `REMINDER_INTERVAL_SECONDS`; concurrent runs are safe.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import DbAppointment, DbDoctor, DbEmailOutbox, DbSpeciality, DbUser
+from utils.appointment_utils import format_appointment_time
+from utils.email_utils import appointment_email_context, outbox_values, render_email
+from utils.outbox import outbox_worker
+
+REMINDER_SUBJECT = "Appointment Reminder - Health Connect"
+
+
+def claim_reminders(db: Session, appointment_ids: list, claimed_at: datetime) -> set:
+    """
+    Mark reminders as sent; returns the ids this run claimed.
+
+    Ids already marked by a concurrent run are left out, so every reminder
+    is queued exactly once.
+    """
+    result = db.execute(
+        update(DbAppointment)
+        .where(DbAppointment.id.in_(appointment_ids), DbAppointment.reminder_sent_at.is_(None))
+        .values(reminder_sent_at=claimed_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(appointment_ids):
+        return set(appointment_ids)
+    return set(db.scalars(
+        select(DbAppointment.id)
+        .where(DbAppointment.id.in_(appointment_ids), DbAppointment.reminder_sent_at == claimed_at)
+    ))
+
+
+def reminder_values(row, now: datetime) -> dict:
+    html_content, text_content = render_email(
+        "appointment_reminder",
+        **appointment_email_context(
+            row.user_name, row.doctor_name, format_appointment_time(row.start),
+            {"speciality": row.speciality, "address": row.address["line1"]}
+        )
+    )
+    return outbox_values(row.email, REMINDER_SUBJECT, html_content, text_content, now)
+
+
+def send_due_reminders(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None
+) -> dict:
+    """
+    Queue reminders for appointments starting within the reminder window.
+
+    Args:
+        db (Session): Database session; committed once per batch
+        now (datetime): Start of the window, defaults to the current time
+        batch_size (int): Appointments read and queued per transaction
+
+    Returns:
+        dict: Number of batches processed and reminders queued
+    """
+    now = now or datetime.now(timezone.utc)
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    window_end = now + timedelta(hours=settings.REMINDER_HOURS_BEFORE)
+
+    query = (
+        select(DbAppointment.id, DbAppointment.start,
+               DbUser.name.label("user_name"), DbUser.email,
+               DbDoctor.name.label("doctor_name"), DbDoctor.address,
+               DbSpeciality.title.label("speciality"))
+        .join(DbAppointment.user)
+        .join(DbAppointment.doctor)
+        .join(DbDoctor.speciality)
+        .where(DbAppointment.start > now, DbAppointment.start <= window_end,
+               DbAppointment.reminder_sent_at.is_(None))
+        .order_by(DbAppointment.start, DbAppointment.id)
+        .limit(batch_size)
+    )
+
+    counts = {"batches": 0, "queued": 0}
+    after = None
+    while True:
+        page = query if after is None else query.where(
+            tuple_(DbAppointment.start, DbAppointment.id) > after)
+        rows = db.execute(page).all()
+        if not rows:
+            break
+        after = (rows[-1].start, rows[-1].id)
+
+        claimed = claim_reminders(db, [row.id for row in rows], now)
+        values = [reminder_values(row, now) for row in rows if row.id in claimed]
+        if values:
+            db.execute(insert(DbEmailOutbox), values)
+        db.commit()
+
+        counts["batches"] += 1
+        counts["queued"] += len(values)
+        if len(rows) < batch_size:
+            break
+    return counts
+
+
+def run_reminders() -> dict:
+    db = SessionLocal()
+    try:
+        return send_due_reminders(db)
+    finally:
+        db.close()
+
+
+class ReminderScheduler:
+    """Run the reminder job every `interval` seconds from a background task."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.runs = 0
+        self.queued = 0
+        self.errors = 0
+        self.last_run_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                counts = await asyncio.to_thread(run_reminders)
+                self.runs += 1
+                self.queued += counts["queued"]
+                self.last_run_at = datetime.now(timezone.utc)
+                if counts["queued"]:
+                    outbox_worker.notify()
+            except Exception as e:
+                self.errors += 1
+                print(f"Appointment reminder run failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "queued": self.queued,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+reminder_scheduler = ReminderScheduler(settings.REMINDER_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    counts = run_reminders()
+    print(f"Queued {counts['queued']} reminders in {counts['batches']} batches.")
@@ -1,5 +1,6 @@
 from database import SessionLocal
 from models import DbDoctor
+from utils.doctor_import import DoctorImporter
 
 doctors_data = [
     {
@@ -184,13 +185,17 @@ def seed_doctors():
             print("Doctors data already exists. Skipping seeding.")
             return
 
-        # Create doctor instances
-        for doctor_data in doctors_data:
-            db_doctor = DbDoctor(**doctor_data)
-            db.add(db_doctor)
+        # Insert through the same batched path as the bulk import endpoint
+        importer = DoctorImporter()
+        for row, doctor_data in enumerate(doctors_data, start=1):
+            if importer.add(row, doctor_data):
+                importer.flush(db)
+        importer.flush(db)
+        report = importer.report()
 
-        db.commit()
-        print("Successfully seeded doctors data!")
+        for error in report["errors"]:
+            print(f"Skipped seed doctor {error['row']}: {error['errors']}")
+        print(f"Successfully seeded {report['inserted']} doctors!")
 
     except Exception as e:
         db.rollback()
@@ -0,0 +1,160 @@
+"""
+Storage for signups awaiting email verification.
+
+`PENDING_SIGNUP_STORE` selects the implementation:
+
+- "database": the `pending_signups` table, shared by every worker process and
+  kept across restarts. Writes join the caller's transaction, so a signup and
+  its verification email are committed together.
+- "memory": a per-process dict with a heap of expiry times. Only suitable for
+  a single worker; holds at most `PENDING_SIGNUP_MAX_ENTRIES` signups.
+
+Expired signups are never returned and are swept as new signups arrive.
+"""
+import heapq
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models import DbPendingSignup
+
+
+class PendingSignupStoreFullError(Exception):
+    """The store holds as many pending signups as it may."""
+
+
+@dataclass(frozen=True)
+class PendingSignup:
+    email: str
+    name: str
+    username: str
+    hashed_password: str
+    verification_code: str
+    expires_at: datetime
+
+
+class PendingSignupStore(ABC):
+    """Interface of pending-signup stores; `db` is the request's session."""
+
+    backend = ""
+
+    @abstractmethod
+    async def get(self, db: AsyncSession, email: str) -> Optional[PendingSignup]:
+        """Return the unexpired pending signup for `email`, if any."""
+
+    @abstractmethod
+    async def put(self, db: AsyncSession, signup: PendingSignup) -> None:
+        """
+        Store a signup, replacing any previous one for the same email.
+
+        Raises:
+            PendingSignupStoreFullError: If the store is at capacity
+        """
+
+    @abstractmethod
+    async def pop(self, db: AsyncSession, email: str) -> None:
+        """Forget the pending signup for `email`."""
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+class MemoryPendingSignupStore(PendingSignupStore):
+    """
+    Per-process store; expired entries are swept from a min-heap of expiry times.
+
+    Args:
+        max_entries (int): Most signups held at once; further signups are refused
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._signups: Dict[str, PendingSignup] = {}
+        # (expires_at, email); entries for replaced signups are skipped when popped
+        self._expiry: List[Tuple[datetime, str]] = []
+        self.rejected = 0
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Drop expired signups; returns how many were removed."""
+        now = now or datetime.now(timezone.utc)
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, email = heapq.heappop(self._expiry)
+            signup = self._signups.get(email)
+            if signup is not None and signup.expires_at == expires_at:
+                del self._signups[email]
+                removed += 1
+        # Replacing signups leaves stale heap entries behind; keep them bounded
+        if len(self._expiry) > 2 * len(self._signups) + 64:
+            self._expiry = [(signup.expires_at, email) for email, signup in self._signups.items()]
+            heapq.heapify(self._expiry)
+        return removed
+
+    async def get(self, db: AsyncSession, email: str) -> Optional[PendingSignup]:
+        signup = self._signups.get(email)
+        if signup is None or signup.expires_at <= datetime.now(timezone.utc):
+            return None
+        return signup
+
+    async def put(self, db: AsyncSession, signup: PendingSignup) -> None:
+        self.sweep()
+        if signup.email not in self._signups and len(self._signups) >= self.max_entries:
+            self.rejected += 1
+            raise PendingSignupStoreFullError("Too many pending signups")
+        self._signups[signup.email] = signup
+        heapq.heappush(self._expiry, (signup.expires_at, signup.email))
+
+    async def pop(self, db: AsyncSession, email: str) -> None:
+        self._signups.pop(email, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "size": len(self._signups),
+            "max_entries": self.max_entries,
+            "rejected": self.rejected,
+        }
+
+
+class DatabasePendingSignupStore(PendingSignupStore):
+    """Store backed by the `pending_signups` table; nothing is committed here."""
+
+    backend = "database"
+
+    async def get(self, db: AsyncSession, email: str) -> Optional[PendingSignup]:
+        row = await db.scalar(
+            select(DbPendingSignup)
+            .where(DbPendingSignup.email == email,
+                   DbPendingSignup.expires_at > datetime.now(timezone.utc))
+        )
+        if row is None:
+            return None
+        return PendingSignup(**{field: getattr(row, field) for field in PendingSignup.__dataclass_fields__})
+
+    async def put(self, db: AsyncSession, signup: PendingSignup) -> None:
+        # Indexed delete of expired rows keeps the table at one OTP lifetime of signups
+        await db.execute(
+            delete(DbPendingSignup)
+            .where((DbPendingSignup.email == signup.email)
+                   | (DbPendingSignup.expires_at <= datetime.now(timezone.utc)))
+        )
+        db.add(DbPendingSignup(**asdict(signup)))
+
+    async def pop(self, db: AsyncSession, email: str) -> None:
+        await db.execute(delete(DbPendingSignup).where(DbPendingSignup.email == email))
+
+
+def create_signup_store(backend: str) -> PendingSignupStore:
+    if backend == "database":
+        return DatabasePendingSignupStore()
+    if backend == "memory":
+        return MemoryPendingSignupStore(settings.PENDING_SIGNUP_MAX_ENTRIES)
+    raise ValueError(f"Unknown PENDING_SIGNUP_STORE: {backend!r}")
+
+
+signup_store = create_signup_store(settings.PENDING_SIGNUP_STORE)
@@ -0,0 +1,164 @@
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models import DbAppointment, DbWorkingHours
+from utils.appointment_utils import MAX_APPOINTMENT_LENGTH, clinic_timezone
+
+
+def working_windows(
+    template: Iterable[Tuple[int, time, time]],
+    start: datetime,
+    end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Expand a weekly working-hours template into UTC windows overlapping [start, end).
+
+    Windows are not clipped to the range, so slot grids laid out from their
+    start are the same whatever range is asked for.
+
+    Args:
+        template: (weekday, start_time, end_time) entries in clinic-local time
+        start (datetime): Range start (aware)
+        end (datetime): Range end (aware)
+
+    Returns:
+        List[Tuple[datetime, datetime]]: Windows sorted by start
+    """
+    zone = clinic_timezone()
+    by_weekday: Dict[int, List[Tuple[time, time]]] = {}
+    for weekday, opens, closes in template:
+        by_weekday.setdefault(weekday, []).append((opens, closes))
+
+    windows = []
+    day = start.astimezone(zone).date()
+    last_day = end.astimezone(zone).date()
+    while day <= last_day:
+        for opens, closes in sorted(by_weekday.get(day.weekday(), [])):
+            window_start = datetime.combine(day, opens, tzinfo=zone)
+            window_end = datetime.combine(day, closes, tzinfo=zone)
+            if window_start < end and start < window_end:
+                windows.append((window_start.astimezone(timezone.utc),
+                                window_end.astimezone(timezone.utc)))
+        day += timedelta(days=1)
+    return windows
+
+
+def check_working_hours(template: Iterable[Tuple[int, time, time]], slot: timedelta) -> None:
+    """
+    Check that a weekly working-hours template lays out a single slot grid.
+
+    Windows on the same weekday must not overlap, and each must start a whole
+    number of slots after midnight. Every slot then starts on the same grid,
+    so two different slots of a doctor never overlap.
+
+    Raises:
+        ValueError: If windows overlap or a window starts off the grid
+    """
+    by_weekday: Dict[int, List[Tuple[time, time]]] = {}
+    for weekday, opens, closes in template:
+        since_midnight = datetime.combine(datetime.min, opens) - datetime.min
+        if since_midnight % slot:
+            raise ValueError(
+                f"Working hours must start on a multiple of {slot.total_seconds() / 60:g} "
+                f"minutes after midnight, not at {opens.isoformat()}")
+        by_weekday.setdefault(weekday, []).append((opens, closes))
+
+    for weekday, windows in by_weekday.items():
+        windows.sort()
+        for (_, previous_end), (opens, _) in zip(windows, windows[1:]):
+            if opens < previous_end:
+                raise ValueError(f"Working hours overlap on weekday {weekday}")
+
+
+def free_slots(
+    windows: List[Tuple[datetime, datetime]],
+    booked: List[Tuple[datetime, datetime]],
+    slot: timedelta,
+    start: datetime,
+    end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Sweep fixed-length slots through working windows, skipping booked intervals.
+
+    Both inputs must be sorted by start. Slots are laid out on a grid starting
+    at each window's start, and only those within [start, end) are returned;
+    a slot is free when no booked interval overlaps it.
+    Runs in O(slots + bookings).
+    """
+    slots = []
+    next_booking = 0
+    for window_start, window_end in windows:
+        slot_start = window_start
+        if slot_start < start:
+            # First grid point at or after the range start
+            slot_start += -((window_start - start) // slot) * slot
+        while slot_start + slot <= min(window_end, end):
+            slot_end = slot_start + slot
+            # Bookings are sorted by start, so ones that ended are never needed again
+            while next_booking < len(booked) and booked[next_booking][1] <= slot_start:
+                next_booking += 1
+            if next_booking == len(booked) or booked[next_booking][0] >= slot_end:
+                slots.append((slot_start, slot_end))
+            slot_start = slot_end
+    return slots
+
+
+def default_template() -> List[Tuple[int, time, time]]:
+    return [
+        (weekday, settings.DEFAULT_WORKING_HOURS_START,
+         settings.DEFAULT_WORKING_HOURS_END)
+        for weekday in settings.DEFAULT_WORKING_DAYS
+    ]
+
+
+async def load_working_template(db: AsyncSession, doctor_id: int) -> List[Tuple[int, time, time]]:
+    """Return the doctor's weekly working hours, falling back to the configured default."""
+    rows = (await db.execute(
+        select(DbWorkingHours.weekday, DbWorkingHours.start_time,
+               DbWorkingHours.end_time)
+        .where(DbWorkingHours.doctor_id == doctor_id)
+    )).all()
+    return [tuple(row) for row in rows] or default_template()
+
+
+async def booked_intervals(
+    db: AsyncSession,
+    doctor_id: int,
+    start: datetime,
+    end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Booked (start, end) intervals overlapping [start, end), sorted by start.
+
+    Both bounds are on `start`, so this is a range scan on the
+    (doctor_id, start) index.
+    """
+    rows = (await db.execute(
+        select(DbAppointment.start, DbAppointment.end)
+        .where(
+            DbAppointment.doctor_id == doctor_id,
+            DbAppointment.start >= start - MAX_APPOINTMENT_LENGTH,
+            DbAppointment.start < end,
+            DbAppointment.end > start
+        )
+        .order_by(DbAppointment.start)
+    )).all()
+    return [tuple(row) for row in rows]
+
+
+async def compute_free_slots(
+    db: AsyncSession,
+    doctor_id: int,
+    start: datetime,
+    end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """Free appointment slots for a doctor in [start, end)."""
+    windows = working_windows(await load_working_template(db, doctor_id), start, end)
+    if not windows:
+        return []
+    booked = await booked_intervals(
+        db, doctor_id, max(windows[0][0], start), min(windows[-1][1], end))
+    return free_slots(
+        windows, booked, timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES), start, end)
@@ -0,0 +1,210 @@
+"""
+Persistent SMTP connection pool.
+
+Opening a connection costs a TCP connect, EHLO, STARTTLS and login, which
+dominates the time to send a message. The pool keeps a few authenticated
+connections open between batches, checks them with NOOP before reusing a
+connection that sat idle, and transparently reconnects when the server
+dropped one.
+"""
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Callable, List, Optional
+from config import settings
+from utils.email_utils import open_smtp_connection
+
+# Errors meaning the connection itself is unusable (as opposed to a rejected message)
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+class PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of at most `size` open SMTP connections.
+
+    Args:
+        size (int): Maximum number of connections (and parallel senders)
+        connect (Callable): Opens a ready-to-use `smtplib.SMTP` connection
+        max_idle (float): Seconds after which an idle connection is closed
+        healthcheck_after (float): Idle seconds after which a connection is NOOP-checked before use
+        max_messages (int): Messages sent on a connection before it is recycled
+    """
+
+    def __init__(
+        self,
+        size: int,
+        connect: Callable[[], smtplib.SMTP] = open_smtp_connection,
+        max_idle: float = 60,
+        healthcheck_after: float = 10,
+        max_messages: int = 100
+    ):
+        self.size = size
+        self.connect = connect
+        self.max_idle = max_idle
+        self.healthcheck_after = healthcheck_after
+        self.max_messages = max_messages
+        self._idle: List[PooledConnection] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.send_seconds = 0.0
+
+    def _open(self) -> PooledConnection:
+        connection = PooledConnection(self.connect())
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _close(connection: PooledConnection) -> None:
+        try:
+            connection.server.quit()
+        except Exception:
+            connection.server.close()
+
+    def _healthy(self, connection: PooledConnection) -> bool:
+        idle = time.monotonic() - connection.last_used
+        if idle > self.max_idle or connection.messages >= self.max_messages:
+            return False
+        if idle < self.healthcheck_after:
+            return True
+        try:
+            return connection.server.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._open()
+            if self._healthy(connection):
+                return connection
+            self._close(connection)
+
+    def _checkin(self, connection: PooledConnection) -> None:
+        connection.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(connection)
+
+    def _send_batch(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Send messages one after another over a single pooled connection."""
+        results: List[Optional[Exception]] = []
+        with self._slots:
+            connection = None
+            try:
+                for message in messages:
+                    retried = False
+                    while True:
+                        if connection is None:
+                            try:
+                                connection = self._checkout()
+                            except Exception as e:
+                                # Server unreachable: fail the rest of the batch at once
+                                results.extend([e] * (len(messages) - len(results)))
+                                return results
+                        try:
+                            connection.server.send_message(message)
+                        except CONNECTION_ERRORS as e:
+                            # The server dropped us; retry once on a fresh connection
+                            connection.server.close()
+                            connection = None
+                            if retried:
+                                results.append(e)
+                                break
+                            retried = True
+                            with self._lock:
+                                self.reconnects += 1
+                            continue
+                        except smtplib.SMTPException as e:
+                            results.append(e)
+                            break
+                        connection.messages += 1
+                        results.append(None)
+                        break
+
+                    if connection is not None and connection.messages >= self.max_messages:
+                        self._close(connection)
+                        connection = None
+            finally:
+                if connection is not None:
+                    self._checkin(connection)
+        return results
+
+    def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send messages over up to `size` connections in parallel.
+
+        Returns:
+            List[Optional[Exception]]: Per message, None if it was accepted or the error
+        """
+        if not messages:
+            return []
+        started = time.perf_counter()
+        workers = min(self.size, len(messages))
+        batches = [messages[i::workers] for i in range(workers)]
+        if workers == 1:
+            batch_results = [self._send_batch(messages)]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batch_results = list(executor.map(self._send_batch, batches))
+
+        # Undo the round-robin split so results line up with `messages`
+        results: List[Optional[Exception]] = [None] * len(messages)
+        for i, batch in enumerate(batch_results):
+            results[i::workers] = batch
+
+        with self._lock:
+            self.send_seconds += time.perf_counter() - started
+            self.failed += sum(1 for error in results if error is not None)
+            self.sent += sum(1 for error in results if error is None)
+        return results
+
+    def prune_idle(self) -> None:
+        """Close connections that have been idle longer than `max_idle`."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [c for c in self._idle if now - c.last_used > self.max_idle]
+            self._idle = [c for c in self._idle if c not in stale]
+        for connection in stale:
+            self._close(connection)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "sent": self.sent,
+                "failed": self.failed,
+                "connections_opened": self.connections_opened,
+                "reconnects": self.reconnects,
+                "messages_per_second": round(self.sent / self.send_seconds, 1) if self.send_seconds else None,
+            }
+
+
+smtp_pool = SMTPConnectionPool(
+    size=settings.SMTP_POOL_SIZE,
+    max_idle=settings.SMTP_POOL_MAX_IDLE_SECONDS,
+    healthcheck_after=settings.SMTP_POOL_HEALTHCHECK_SECONDS,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+)
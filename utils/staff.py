@@ -0,0 +1,38 @@
+"""
+Grant or revoke staff access.
+
+Staff may create and import doctors, set their working hours and see their
+appointments with patient details. Workers cache users for up to
+PRINCIPAL_CACHE_TTL_SECONDS, so a change can take that long to apply.
+
+Usage:
+    python -m utils.staff <username> [--revoke]
+"""
+import argparse
+import sys
+from database import SessionLocal
+from models import DbUser
+
+
+def set_staff(username: str, is_staff: bool) -> bool:
+    """Set a user's staff flag; returns False if there is no such user."""
+    db = SessionLocal()
+    try:
+        user = db.query(DbUser).filter(DbUser.username == username).first()
+        if user is None:
+            return False
+        user.is_staff = is_staff
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("username")
+    parser.add_argument("--revoke", action="store_true", help="remove staff access")
+    args = parser.parse_args()
+    if not set_staff(args.username, not args.revoke):
+        sys.exit(f"No user named {args.username!r}")
+    print(f"{args.username} is {'no longer' if args.revoke else 'now'} staff.")
@@ -1,11 +1,43 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from config import settings
 from models import DbUser
 from schemas.token import TokenData
+from utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request handlers; detached from any session."""
+    id: int
+    username: str
+    name: str
+    email: str
+    is_staff: bool
+
+
+# Principals by username (the token `sub`), per worker. Tokens are still
+# verified on every request; only the user lookup is cached.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(DbUser, "before_update")
+@event.listens_for(DbUser, "before_delete")
+def invalidate_principal(mapper, connection, target: DbUser) -> None:
+    """Drop a changed or deleted user's cached principal (ORM flushes only)."""
+    if inspect(target).attrs.username.history.has_changes():
+        # The previous username is not necessarily loaded; renames are rare
+        principal_cache.clear()
+    else:
+        principal_cache.pop(target.username)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -34,16 +66,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(token: str, db: Session) -> DbUser:
+async def get_current_user(token: str, db: AsyncSession) -> Principal:
     """
     Get the current user from the JWT token.
 
     Args:
         token (str): JWT token
-        db (Session): Database session
+        db (AsyncSession): Database session, only used on a principal cache miss
 
     Returns:
-        DbUser: User object
+        Principal: The authenticated user
 
     Raises:
         HTTPException: If token is invalid or user not found
@@ -63,9 +95,31 @@ async def get_current_user(token: str, db: Session) -> DbUser:
     except JWTError:
         raise credentials_exception
 
-    user = db.query(DbUser).filter(
-        DbUser.username == token_data.username).first()
+    principal = principal_cache.get(token_data.username)
+    if principal is not None:
+        return principal
+
+    user = (await db.execute(
+        select(DbUser.id, DbUser.username, DbUser.name, DbUser.email, DbUser.is_staff)
+        .where(DbUser.username == token_data.username)
+    )).first()
     if user is None:
         raise credentials_exception
 
-    return user
+    return principal_cache.set(token_data.username, Principal(**user._mapping))
+
+
+async def get_current_staff(token: str, db: AsyncSession) -> Principal:
+    """
+    Get the current user from the JWT token and require them to be staff.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, 403 if the user is not staff
+    """
+    principal = await get_current_user(token, db)
+    if not principal.is_staff:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Staff access required"
+        )
+    return principal